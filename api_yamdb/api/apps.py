@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import api.v1.signals  # noqa: F401
+        from api_yamdb.slow_queries import install_slow_query_log
+
+        connection_created.connect(install_slow_query_log)
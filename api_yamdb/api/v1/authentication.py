@@ -0,0 +1,102 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from api_yamdb.constants import USER_CACHE_MAX_SIZE, USER_CACHE_TTL
+
+USER_SNAPSHOT_FIELDS = ('id', 'username', 'role', 'is_staff', 'is_active')
+
+
+class UserSnapshotCache:
+    """LRU-кэш снимков пользователей с ограниченным временем жизни.
+
+    Кэш живет в памяти процесса: сохранение или удаление пользователя
+    сбрасывает запись только в текущем процессе, в остальных она
+    устаревает по истечении `ttl` секунд.
+    """
+
+    def __init__(self, max_size=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._snapshots = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, user_id):
+        """Возвращает снимок пользователя или None, если его нет в кэше."""
+        with self._lock:
+            cached = self._snapshots.get(user_id)
+            if cached is None:
+                return None
+            expires, snapshot = cached
+            if expires < time.monotonic():
+                del self._snapshots[user_id]
+                return None
+            self._snapshots.move_to_end(user_id)
+            return snapshot
+
+    def set(self, user_id, snapshot):
+        """Сохраняет снимок пользователя, вытесняя самые старые записи."""
+        with self._lock:
+            self._snapshots[user_id] = (
+                time.monotonic() + self.ttl, snapshot
+            )
+            self._snapshots.move_to_end(user_id)
+            while len(self._snapshots) > self.max_size:
+                self._snapshots.popitem(last=False)
+
+    def invalidate(self, user_id):
+        """Удаляет снимок пользователя из кэша."""
+        with self._lock:
+            self._snapshots.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+
+
+user_cache = UserSnapshotCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """Аутентификация по JWT-токену с кэшированием пользователей.
+
+    Пользователь восстанавливается из снимка полей `USER_SNAPSHOT_FIELDS`
+    без запроса к базе данных; остальные поля модели отложены
+    и загружаются при первом обращении к ним.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            return super().get_user(validated_token)
+
+        snapshot = user_cache.get(user_id)
+        if snapshot is None:
+            snapshot = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values(*USER_SNAPSHOT_FIELDS).first()
+            if snapshot is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            user_cache.set(user_id, snapshot)
+
+        fields = self.user_model._meta.concrete_fields
+        user = self.user_model.from_db(
+            DEFAULT_DB_ALIAS,
+            [field.attname for field in fields],
+            [snapshot.get(field.attname, DEFERRED) for field in fields]
+        )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+
+
+def get_version_key(model, scope=None):
+    key = f'api:v1:version:{model._meta.label_lower}'
+    return f'{key}:{scope}' if scope else key
+
+
+def get_parent_scope(field, parent_id):
+    """Возвращает область версии объектов одного родителя."""
+    return f'{field}={parent_id}'
+
+
+def get_model_version(model, scope=None):
+    """Возвращает текущую версию данных модели.
+
+    С областью `scope` версия относится только к части объектов
+    модели, например к отзывам одного произведения.
+
+    Версия начинается с текущего времени в наносекундах, поэтому после
+    вытеснения ключа версии из кэша она не повторяет прежние значения,
+    под которыми еще могут храниться устаревшие ответы.
+    """
+    return cache.get_or_set(
+        get_version_key(model, scope), time.time_ns, timeout=None
+    )
+
+
+def get_model_versions(models):
+    """Возвращает текущие версии данных нескольких моделей."""
+    keys = [get_version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    return tuple(
+        versions[key] if key in versions else get_model_version(model)
+        for key, model in zip(keys, models)
+    )
+
+
+def bump_model_version(model, scope=None):
+    """Увеличивает версию данных модели, делая устаревшими ответы в кэше.
+
+    Возвращает новую версию.
+    """
+    key = get_version_key(model, scope)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = time.time_ns()
+        cache.set(key, version, timeout=None)
+        return version
+
+
+def get_list_cache_key(model, request):
+    """Формирует ключ кэша ответа по адресу запроса и версии модели."""
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return (f'api:v1:list:{model._meta.label_lower}:'
+            f'{get_model_version(model)}:{url}')
+
+
+def get_facets_cache_key(models, params):
+    """Формирует ключ кэша по параметрам фильтрации и версиям моделей."""
+    signature = '&'.join(
+        f'{key}={value}' for key, value in sorted(params.items())
+    )
+    versions = ':'.join(str(get_model_version(model)) for model in models)
+    return (f'api:v1:facets:{versions}:'
+            f'{hashlib.md5(signature.encode()).hexdigest()}')
@@ -0,0 +1,444 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from functools import partial
+from threading import Lock
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField
+from django.db.models.functions import Cast
+
+from api.v1.cache import get_model_versions
+from api.v1.filters import GENRE_MATCH_ALL, split_filter_values
+from api_yamdb.constants import FACET_INDEX_TTL, FACET_YEAR_BUCKET
+from reviews.models import Category, Genre, GenreTitle, Title
+
+FACET_QUERY_PARAMS = {
+    'category', 'genre', 'genre_match', 'year', 'page', 'ordering'
+}
+FACET_IGNORED_PARAMS = {'page', 'ordering', 'pagination', 'cursor'}
+FACET_MODELS = (Title, GenreTitle, Genre, Category)
+FACET_BITSETS = {'genre': 'genres', 'category': 'categories'}
+
+
+def make_bitset(positions, size):
+    """Собирает битовую маску из номеров установленных битов."""
+    bits = bytearray((size + 7) // 8)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, 'little')
+
+
+def count_bits(bitset):
+    return bin(bitset).count('1')
+
+
+def get_year_bucket(year):
+    """Возвращает первый год интервала, в который попадает год."""
+    return year // FACET_YEAR_BUCKET * FACET_YEAR_BUCKET
+
+
+def format_facets(count, genres, categories, years):
+    """Приводит количества произведений к формату ответа."""
+    return {
+        'count': count,
+        'genre': [
+            {'slug': slug, 'count': count}
+            for slug, count in sorted(genres.items()) if count
+        ],
+        'category': [
+            {'slug': slug, 'count': count}
+            for slug, count in sorted(categories.items()) if count
+        ],
+        'year': [
+            {
+                'year_from': year,
+                'year_to': year + FACET_YEAR_BUCKET - 1,
+                'count': count
+            }
+            for year, count in sorted(years.items()) if count
+        ]
+    }
+
+
+def count_title_facets(queryset):
+    """Считает произведения выборки по жанрам, категориям и интервалам
+    лет: общее количество и три групповых запроса."""
+    queryset = queryset.order_by().prefetch_related(None)
+    genres = GenreTitle.objects.filter(
+        title__in=queryset.values('pk')
+    ).order_by().values('genre__slug').annotate(
+        total=Count('title', distinct=True)
+    ).values_list('genre__slug', 'total')
+    categories = queryset.filter(
+        category__isnull=False
+    ).values('category__slug').annotate(
+        total=Count('pk')
+    ).values_list('category__slug', 'total')
+    years = queryset.annotate(
+        bucket=Cast(
+            F('year') / FACET_YEAR_BUCKET, output_field=IntegerField()
+        ) * FACET_YEAR_BUCKET
+    ).values('bucket').annotate(
+        total=Count('pk')
+    ).values_list('bucket', 'total')
+    return format_facets(
+        queryset.count(), dict(genres), dict(categories), dict(years)
+    )
+
+
+class BitsetIds:
+    """Последовательность id произведений, заданная битовой маской.
+
+    Номер бита совпадает с позицией произведения в сортировке
+    по названию, поэтому срез сразу дает нужную страницу.
+    """
+
+    def __init__(self, bitset, snapshot):
+        self.bitset = bitset
+        self.snapshot = snapshot
+        self.ids = snapshot.ids
+
+    def __len__(self):
+        return count_bits(self.bitset)
+
+    def __getitem__(self, index):
+        start, stop, _ = index.indices(len(self))
+        bits = bin(self.bitset)[:1:-1]
+        position = -1
+        for _ in range(start):
+            position = bits.find('1', position + 1)
+        result = []
+        for _ in range(stop - start):
+            position = bits.find('1', position + 1)
+            if position == -1:
+                break
+            result.append(self.ids[position])
+        return result
+
+
+def insert_bit(bitset, position):
+    """Вставляет нулевой бит в позицию, сдвигая старшие биты."""
+    low = bitset & ((1 << position) - 1)
+    return low | (bitset >> position << (position + 1))
+
+
+def remove_bit(bitset, position):
+    """Удаляет бит в позиции, сдвигая старшие биты."""
+    low = bitset & ((1 << position) - 1)
+    return low | (bitset >> (position + 1) << position)
+
+
+class FacetSnapshot:
+    """Неизменяемое состояние индекса фильтров.
+
+    Изменения не правят состояние на месте, а создают новое, поэтому
+    запрос, получивший состояние, работает с согласованными id
+    и масками, даже если индекс в это время обновляется.
+    """
+
+    def __init__(self, keys, genres, categories, years, slugs, versions,
+                 built=None):
+        self.keys = keys
+        self.ids = [title_id for _, title_id in keys]
+        self.positions = {
+            title_id: position for position, title_id in enumerate(self.ids)
+        }
+        self.genres = genres
+        self.categories = categories
+        self.years = years
+        self.slugs = slugs
+        self.all = (1 << len(keys)) - 1
+        self.versions = versions
+        self.built = time.monotonic() if built is None else built
+
+    @classmethod
+    def build(cls):
+        """Строит состояние по данным из базы."""
+        versions = get_model_versions(FACET_MODELS)
+        titles = Title.objects.order_by('name', 'id').values_list(
+            'id', 'name', 'year', 'category__slug'
+        )
+        keys = []
+        genres = defaultdict(list)
+        categories = defaultdict(list)
+        years = defaultdict(list)
+        positions = {}
+        for position, (title_id, name, year, category) in enumerate(titles):
+            keys.append((name, title_id))
+            positions[title_id] = position
+            years[year].append(position)
+            if category is not None:
+                categories[category].append(position)
+        genre_titles = GenreTitle.objects.values_list(
+            'title_id', 'genre__slug'
+        )
+        for title_id, genre in genre_titles.iterator():
+            if title_id in positions:
+                genres[genre].append(positions[title_id])
+        size = len(keys)
+        return cls(
+            keys,
+            *(
+                {key: make_bitset(value, size) for key, value in bits.items()}
+                for bits in (genres, categories, years)
+            ),
+            {
+                'genre': dict(Genre.objects.values_list('id', 'slug')),
+                'category': dict(Category.objects.values_list('id', 'slug'))
+            },
+            versions
+        )
+
+    def replace(self, **changes):
+        """Возвращает копию состояния с измененными атрибутами."""
+        values = {
+            name: getattr(self, name)
+            for name in ('keys', 'genres', 'categories', 'years', 'slugs',
+                         'versions', 'built')
+        }
+        values.update(changes)
+        return FacetSnapshot(**values)
+
+    def without_title(self, title_id):
+        """Удаляет произведение из всех масок."""
+        position = self.positions.get(title_id)
+        if position is None:
+            return self
+        keys = self.keys[:position] + self.keys[position + 1:]
+        return self.replace(keys=keys, **{
+            name: {
+                key: remove_bit(bitset, position)
+                for key, bitset in getattr(self, name).items()
+            }
+            for name in ('genres', 'categories', 'years')
+        })
+
+    def with_title(self, title, genres):
+        """Добавляет произведение с жанрами `genres` в порядке названий."""
+        key = (title.name, title.pk)
+        position = bisect_left(self.keys, key)
+        bit = 1 << position
+        category = self.slugs['category'].get(title.category_id)
+        changes = {
+            name: {
+                key: insert_bit(bitset, position)
+                for key, bitset in getattr(self, name).items()
+            }
+            for name in ('genres', 'categories', 'years')
+        }
+        for name, values in (
+                ('genres', genres),
+                ('categories', [category] if category else []),
+                ('years', [title.year])):
+            for value in values:
+                changes[name][value] = changes[name].get(value, 0) | bit
+        keys = self.keys[:position] + [key] + self.keys[position:]
+        return self.replace(keys=keys, **changes)
+
+    def with_title_changed(self, title):
+        """Обновляет название, год и категорию произведения."""
+        position = self.positions.get(title.pk)
+        genres = [] if position is None else [
+            slug for slug, bitset in self.genres.items()
+            if bitset >> position & 1
+        ]
+        return self.without_title(title.pk).with_title(title, genres)
+
+    def with_genre_bit(self, title_id, genre_id, present):
+        """Добавляет или убирает жанр произведения."""
+        position = self.positions.get(title_id)
+        slug = self.slugs['genre'].get(genre_id)
+        if position is None or slug is None:
+            return self
+        genres = dict(self.genres)
+        bitset = genres.get(slug, 0)
+        genres[slug] = (
+            bitset | 1 << position if present else bitset & ~(1 << position)
+        )
+        return self.replace(genres=genres)
+
+    def with_slug(self, kind, object_id, slug):
+        """Добавляет жанр или категорию либо меняет их slug."""
+        slugs = {**self.slugs, kind: {**self.slugs[kind], object_id: slug}}
+        bitsets = dict(getattr(self, FACET_BITSETS[kind]))
+        old_slug = self.slugs[kind].get(object_id)
+        if old_slug is not None and old_slug != slug:
+            bitsets[slug] = bitsets.pop(old_slug, 0)
+        return self.replace(slugs=slugs, **{FACET_BITSETS[kind]: bitsets})
+
+    def without_slug(self, kind, object_id):
+        """Удаляет жанр или категорию вместе с их маской."""
+        slugs = dict(self.slugs[kind])
+        bitsets = dict(getattr(self, FACET_BITSETS[kind]))
+        bitsets.pop(slugs.pop(object_id, None), None)
+        return self.replace(
+            slugs={**self.slugs, kind: slugs}, **{FACET_BITSETS[kind]: bitsets}
+        )
+
+
+class TitleFacetIndex:
+    """Битовые индексы произведений по жанрам, категориям и годам.
+
+    Индекс живет в памяти процесса и строится при первом обращении.
+    Сигналы текущего процесса точечно меняют биты в копии состояния,
+    а изменения из других процессов обнаруживаются по версиям моделей
+    в общем кэше. Раз в `ttl` секунд индекс перестраивается в любом
+    случае, чтобы учесть массовые изменения, не вызывающие сигналов.
+    """
+
+    def __init__(self, ttl=FACET_INDEX_TTL):
+        self.ttl = ttl
+        self._lock = Lock()
+        self._snapshot = None
+        self._own_versions = defaultdict(set)
+
+    def invalidate(self):
+        self._snapshot = None
+
+    def is_stale(self, snapshot):
+        return (
+            snapshot is None
+            or time.monotonic() - snapshot.built > self.ttl
+            or snapshot.versions != get_model_versions(FACET_MODELS)
+        )
+
+    def get_snapshot(self):
+        """Возвращает актуальное состояние индекса."""
+        snapshot = self._snapshot
+        if self.is_stale(snapshot):
+            with self._lock:
+                snapshot = self._snapshot
+                if self.is_stale(snapshot):
+                    snapshot = self._snapshot = FacetSnapshot.build()
+                    self._forget_versions(snapshot.versions)
+        return snapshot
+
+    def note_version(self, model, version):
+        """Запоминает версию модели, выданную изменением этого процесса."""
+        if model in FACET_MODELS:
+            with self._lock:
+                self._own_versions[model].add(version)
+
+    def _forget_versions(self, versions):
+        for model, version in zip(FACET_MODELS, versions):
+            self._own_versions[model] = {
+                own for own in self._own_versions[model] if own > version
+            }
+
+    def _has_only_own_changes(self, before, after):
+        """Проверяет, что версии моделей увеличены только изменениями
+        этого процесса."""
+        for model, old, new in zip(FACET_MODELS, before, after):
+            own = self._own_versions[model]
+            if new < old or new - old > len(own):
+                return False
+            if any(version not in own for version in range(old + 1, new + 1)):
+                return False
+        return True
+
+    def apply(self, method, *args):
+        """Применяет изменение к состоянию индекса после фиксации
+        транзакции, если индекс построен.
+
+        Новые версии моделей принимаются, только если их увеличили
+        изменения этого процесса; иначе в промежутке данные менял другой
+        процесс, и индекс сбрасывается для перестройки.
+        """
+        transaction.on_commit(partial(self._apply, method, *args))
+
+    def _apply(self, method, *args):
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None:
+                return
+            versions = get_model_versions(FACET_MODELS)
+            if not self._has_only_own_changes(snapshot.versions, versions):
+                self._snapshot = None
+                return
+            snapshot = getattr(snapshot, method)(*args)
+            self._snapshot = snapshot.replace(versions=versions)
+            self._forget_versions(versions)
+
+    @staticmethod
+    def match(bitsets, value):
+        """Объединяет маски всех slug, содержащих значение."""
+        value = value.casefold()
+        result = 0
+        for slug, bitset in bitsets.items():
+            if value in slug.casefold():
+                result |= bitset
+        return result
+
+    def filter(self, category=None, genres=(), genre_match_all=False,
+               year=None):
+        """Возвращает маску произведений, подходящих под фильтры."""
+        snapshot = self.get_snapshot()
+        result = snapshot.all
+        if category:
+            result &= self.match(snapshot.categories, category)
+        if genres:
+            genre_bitsets = [
+                self.match(snapshot.genres, genre) for genre in genres
+            ]
+            if genre_match_all:
+                for bitset in genre_bitsets:
+                    result &= bitset
+            else:
+                union = 0
+                for bitset in genre_bitsets:
+                    union |= bitset
+                result &= union
+        if year is not None:
+            result &= snapshot.years.get(year, 0)
+        return BitsetIds(result, snapshot)
+
+    def count_facets(self, title_ids):
+        """Считает произведения выборки по жанрам, категориям
+        и интервалам лет."""
+        snapshot, bitset = title_ids.snapshot, title_ids.bitset
+        years = defaultdict(int)
+        for year, year_bitset in snapshot.years.items():
+            years[get_year_bucket(year)] += count_bits(year_bitset & bitset)
+        return format_facets(
+            count_bits(bitset),
+            {
+                slug: count_bits(genre_bitset & bitset)
+                for slug, genre_bitset in snapshot.genres.items()
+            },
+            {
+                slug: count_bits(category_bitset & bitset)
+                for slug, category_bitset in snapshot.categories.items()
+            },
+            years
+        )
+
+    def filter_request(self, request):
+        """Отбирает произведения по параметрам запроса.
+
+        Возвращает None, если индекс выключен или запрос содержит
+        параметры, которые индекс не обслуживает.
+        """
+        if not getattr(settings, 'TITLE_FACET_INDEX', False):
+            return None
+        params = request.query_params
+        if set(params) - FACET_QUERY_PARAMS:
+            return None
+        if params.get('ordering', 'name') != 'name':
+            return None
+        year = params.get('year') or None
+        if year is not None:
+            try:
+                year = int(year)
+            except ValueError:
+                return None
+        return self.filter(
+            category=params.get('category'),
+            genres=split_filter_values(params.get('genre', '')),
+            genre_match_all=params.get('genre_match') == GENRE_MATCH_ALL,
+            year=year
+        )
+
+
+title_facet_index = TitleFacetIndex()
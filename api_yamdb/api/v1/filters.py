@@ -1,19 +1,28 @@
+from django.db.models import Exists, OuterRef, Q
 from django_filters.rest_framework import CharFilter, FilterSet
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+from rest_framework.settings import api_settings
 
-from reviews.models import Title
+from reviews.models import Category, GenreTitle, Title
+from reviews.search import search_titles
+
+GENRE_MATCH_ALL = 'all'
+
+
+def split_filter_values(value):
+    """Разбивает значение фильтра на непустые значения через запятую."""
+    return [part.strip() for part in value.split(',') if part.strip()]
 
 
 class TitleGenreFilter(FilterSet):
-    """Фильтр выборки произведений по определенным полям."""
+    """Фильтр выборки произведений по определенным полям.
 
-    category = CharFilter(
-        field_name='category__slug',
-        lookup_expr='icontains'
-    )
-    genre = CharFilter(
-        field_name='genre__slug',
-        lookup_expr='icontains'
-    )
+    Жанр и категория проверяются подзапросами, а не соединением таблиц,
+    поэтому произведения в выборке не повторяются.
+    """
+
+    category = CharFilter(method='filter_category')
+    genre = CharFilter(method='filter_genre')
     name = CharFilter(
         field_name='name',
         lookup_expr='contains'
@@ -22,3 +31,58 @@ class TitleGenreFilter(FilterSet):
     class Meta:
         model = Title
         fields = ('category', 'genre', 'name', 'year')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(
+            category__in=Category.objects.filter(slug__icontains=value)
+        )
+
+    def filter_genre(self, queryset, name, value):
+        """Отбирает произведения по жанрам, перечисленным через запятую.
+
+        По умолчанию достаточно совпадения с одним из жанров,
+        при `genre_match=all` требуется совпадение со всеми.
+        """
+        genre_titles = GenreTitle.objects.filter(title=OuterRef('pk'))
+        slugs = split_filter_values(value)
+        if self.data.get('genre_match') == GENRE_MATCH_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(
+                    Exists(genre_titles.filter(genre__slug__icontains=slug))
+                )
+            return queryset
+        condition = Q()
+        for slug in slugs:
+            condition |= Q(genre__slug__icontains=slug)
+        return queryset.filter(Exists(genre_titles.filter(condition)))
+
+
+class StableOrderingFilter(OrderingFilter):
+    """Сортировка с id в качестве последнего ключа для стабильных страниц."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering = (*ordering, 'id')
+        return ordering
+
+
+class TitleSearchFilter(BaseFilterBackend):
+    """Полнотекстовый поиск произведений по названию и описанию.
+
+    Без явной сортировки результаты упорядочиваются по релевантности.
+    """
+
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        queryset = search_titles(queryset, query)
+        if (
+            'search_rank' in queryset.query.annotations
+            and api_settings.ORDERING_PARAM not in request.query_params
+        ):
+            queryset = queryset.order_by('search_rank', 'id')
+        return queryset
@@ -1,11 +1,123 @@
+import hashlib
+from calendar import timegm
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from rest_framework import filters, mixins
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
 
-from api_yamdb.constants import MAX_SEARCH_RESULTS
+from api_yamdb.constants import LIST_CACHE_TIMEOUT, MAX_SEARCH_RESULTS
+from api_yamdb.timing import current_timing
+from api.v1.cache import (
+    get_list_cache_key,
+    get_model_version,
+    get_parent_scope
+)
 from api.v1.permissions import IsAdminOrReadOnly
 
 
+class CachedListMixin:
+    """Кэширует ответы на запросы списка объектов.
+
+    Ключ кэша включает адрес запроса и версию данных модели,
+    которую сигналы увеличивают при сохранении и удалении объектов.
+    """
+
+    list_cache_timeout = LIST_CACHE_TIMEOUT
+
+    def list(self, request, *args, **kwargs):
+        key = get_list_cache_key(self.queryset.model, request)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = super().list(request, *args, **kwargs)
+        cache.set(key, response.data, self.list_cache_timeout)
+        return response
+
+
+class ConditionalGetMixin:
+    """Поддерживает условные GET-запросы по заголовкам ETag и Last-Modified.
+
+    ETag списка вычисляется по версии объектов родителя `parent_field`
+    в кэше, которую сигналы увеличивают при сохранении и удалении
+    объектов, а не по телу ответа или запросу ко всей коллекции, поэтому
+    ответ 304 отдается до сериализации, а стоимость проверки не зависит
+    от размера списка. Last-Modified отдается только для отдельного
+    объекта: версия списка не содержит времени изменения.
+    """
+
+    modified_field = 'updated'
+    parent_field = None
+
+    def get_etag(self, request, markers):
+        """Формирует сильный ETag по признакам изменения и адресу запроса."""
+        source = '|'.join((
+            request.get_full_path(),
+            str(request.accepted_media_type),
+            *(f'{key}={value}' for key, value in sorted(markers.items()))
+        ))
+        return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+    def get_conditional_response(self, request, markers, handler):
+        """Возвращает 304, если данные не изменились, иначе ответ handler
+        с заголовками ETag и Last-Modified."""
+        etag = self.get_etag(request, markers)
+        modified = markers.get('modified')
+        last_modified = modified and timegm(modified.utctimetuple())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is not None:
+            return response
+        response = handler()
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        scope = get_parent_scope(
+            self.parent_field, self.kwargs[f'{self.parent_field}_id']
+        )
+        markers = {
+            'version': get_model_version(self.get_queryset().model, scope)
+        }
+        return self.get_conditional_response(
+            request,
+            markers,
+            lambda: super(ConditionalGetMixin, self).list(
+                request, *args, **kwargs
+            )
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        markers = {
+            'pk': instance.pk,
+            'modified': getattr(instance, self.modified_field)
+        }
+        return self.get_conditional_response(
+            request,
+            markers,
+            lambda: Response(self.get_serializer(instance).data)
+        )
+
+
+class TimedSerializerMixin:
+    """Учитывает время сериализации в замерах заголовка Server-Timing."""
+
+    def to_representation(self, instance):
+        timing = current_timing.get()
+        if timing is None:
+            return super().to_representation(instance)
+        with timing.measure('serializer'):
+            return super().to_representation(instance)
+
+
 class ListCreateDestroyViewSet(
+    CachedListMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin
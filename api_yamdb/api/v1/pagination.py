@@ -0,0 +1,198 @@
+import json
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import (
+    BasePagination,
+    CursorPagination,
+    PageNumberPagination
+)
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по дате публикации и id."""
+
+    ordering = ('-pub_date', '-id')
+
+
+class CursorOrPageNumberPagination(PageNumberPagination):
+    """Постраничная пагинация с курсорным режимом по запросу клиента.
+
+    Курсорный режим включается параметром `?pagination=cursor`
+    или наличием курсора в запросе. В этом режиме не выполняются
+    COUNT и OFFSET, поэтому любая страница стоит как первая.
+    """
+
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def use_cursor(self, request):
+        cursor_query_param = self.cursor_pagination_class.cursor_query_param
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or bool(request.query_params.get(cursor_query_param))
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
+
+
+def get_keyset_ordering(field, descending):
+    """Возвращает сортировку по полю с id в качестве второго ключа.
+
+    Пустые значения считаются наименьшими.
+    """
+    if descending:
+        return (F(field).desc(nulls_last=True), '-pk')
+    return (F(field).asc(nulls_first=True), 'pk')
+
+
+def get_keyset_filters(field, value, pk, descending, nullable):
+    """Возвращает условия для строк, идущих после строки (value, pk).
+
+    Условия соответствуют идущим подряд частям результата и выполняются
+    отдельными запросами. Каждое начинается с границы по значению поля
+    (`>=`, `<=`, `IS NULL`), по которой база данных находит начало
+    страницы в индексе (поле, id), а не просматривает индекс с начала,
+    как при OFFSET.
+    """
+    if value is None:
+        if descending:
+            return (Q(**{f'{field}__isnull': True, 'pk__lt': pk}),)
+        return (
+            Q(**{f'{field}__isnull': True, 'pk__gt': pk}),
+            Q(**{f'{field}__isnull': False}),
+        )
+    if descending:
+        filters = (
+            Q(**{f'{field}__lte': value})
+            & (Q(**{f'{field}__lt': value}) | Q(pk__lt=pk)),
+        )
+        if nullable:
+            filters += (Q(**{f'{field}__isnull': True}),)
+        return filters
+    return (
+        Q(**{f'{field}__gte': value})
+        & (Q(**{f'{field}__gt': value}) | Q(pk__gt=pk)),
+    )
+
+
+class KeysetPagination(BasePagination):
+    """Пагинация по ключу (значение поля сортировки, id).
+
+    Страница выбирается условием по последней строке предыдущей
+    страницы и индексом (поле, id), без COUNT и OFFSET. Ответ содержит
+    только ссылки `next` и `previous`.
+    """
+
+    cursor_query_param = 'cursor'
+    ordering_query_param = api_settings.ORDERING_PARAM
+    ordering_fields = ('name',)
+    page_size = api_settings.PAGE_SIZE
+
+    def get_ordering(self, request):
+        """Возвращает поле и направление сортировки из запроса."""
+        ordering = request.query_params.get(self.ordering_query_param, '')
+        for term in ordering.split(','):
+            term = term.strip()
+            if term.lstrip('-') in self.ordering_fields:
+                return term.lstrip('-'), term.startswith('-')
+        return self.ordering_fields[0], False
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode()).decode())
+            return cursor['value'], int(cursor['pk']), bool(cursor['reverse'])
+        except (BinasciiError, KeyError, TypeError, ValueError):
+            raise NotFound('Некорректный курсор.')
+
+    def encode_cursor(self, instance, reverse):
+        cursor = {
+            'value': getattr(instance, self.field),
+            'pk': instance.pk,
+            'reverse': reverse
+        }
+        encoded = b64encode(json.dumps(cursor).encode()).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.field, descending = self.get_ordering(request)
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[2]
+        queryset = queryset.order_by(
+            *get_keyset_ordering(self.field, descending != reverse)
+        )
+        filters = (Q(),)
+        if cursor is not None:
+            value, pk, _ = cursor
+            filters = get_keyset_filters(
+                self.field, value, pk, descending != reverse,
+                queryset.model._meta.get_field(self.field).null
+            )
+        results = []
+        for keyset_filter in filters:
+            results += queryset.filter(keyset_filter)[
+                :self.page_size + 1 - len(results)
+            ]
+            if len(results) > self.page_size:
+                break
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+        self.next = self.previous = None
+        if not results:
+            return results
+        if reverse or has_more:
+            self.next = self.encode_cursor(results[-1], False)
+        if has_more if reverse else cursor is not None:
+            self.previous = self.encode_cursor(results[0], True)
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.next,
+            'previous': self.previous,
+            'results': data
+        })
+
+
+class TitleKeysetPagination(KeysetPagination):
+    """Пагинация произведений по названию, году или рейтингу."""
+
+    ordering_fields = ('name', 'year', 'rating')
+
+
+class TitlePagination(CursorOrPageNumberPagination):
+    """Пагинация произведений с режимом пагинации по ключу."""
+
+    cursor_pagination_class = TitleKeysetPagination
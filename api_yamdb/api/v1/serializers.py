@@ -1,9 +1,10 @@
 import re
 
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
 
+from api.v1.mixins import TimedSerializerMixin
+from api.v1.utils import get_request_object
 from api_yamdb.constants import (
     USERNAME_MAX_LENGTH,
     EMAIL_MAX_LENGTH,
@@ -16,7 +17,7 @@ from users.models import User
 User = get_user_model()
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор категорий."""
 
     class Meta:
@@ -24,7 +25,7 @@ class CategorySerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор жанров."""
 
     class Meta:
@@ -32,7 +33,7 @@ class GenreSerializer(serializers.ModelSerializer):
         exclude = ('id',)
 
 
-class TitleGETSerializer(serializers.ModelSerializer):
+class TitleGETSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор объектов класса Title при GET запросах."""
 
     genre = GenreSerializer(read_only=True, many=True)
@@ -52,7 +53,7 @@ class TitleGETSerializer(serializers.ModelSerializer):
         model = Title
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор модели произведений."""
 
     genre = serializers.SlugRelatedField(
@@ -82,7 +83,7 @@ class TitleSerializer(serializers.ModelSerializer):
         return TitleGETSerializer(instance).data
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор отзывов."""
 
     author = serializers.SlugRelatedField(
@@ -91,14 +92,15 @@ class ReviewSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        exclude = ('title',)
+        exclude = ('title', 'updated')
         model = Review
 
     def validate(self, data):
         """Запрещает пользователям оставлять повторные отзывы."""
         request = self.context.get('request')
         if request.method == 'POST':
-            title = get_object_or_404(
+            title = get_request_object(
+                request,
                 Title,
                 pk=self.context.get('view').kwargs.get('title_id')
             )
@@ -109,7 +111,7 @@ class ReviewSerializer(serializers.ModelSerializer):
         return data
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор комментариев."""
 
     author = serializers.SlugRelatedField(
@@ -119,10 +121,10 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        exclude = ('review',)
+        exclude = ('review', 'updated')
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Сериализатор для класса User с валидацией."""
 
     username = serializers.CharField(
@@ -171,7 +173,7 @@ class UserSerializer(serializers.ModelSerializer):
         return username
 
 
-class SignUpSerializer(serializers.ModelSerializer):
+class SignUpSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """
     Сериализатор полей username и email
     для класса User с валидацией.
@@ -189,7 +191,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         return user
 
 
-class GetTokenSerializer(serializers.Serializer):
+class GetTokenSerializer(TimedSerializerMixin, serializers.Serializer):
     """
     Сериализатор полей username и confirmation_code
     для класса User с валидацией.
@@ -0,0 +1,117 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.v1.authentication import user_cache
+from api.v1.cache import bump_model_version, get_parent_scope
+from api.v1.facets import title_facet_index
+from api.v1.suggest import title_index
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from users.models import User
+
+
+@receiver((post_save, post_delete), sender=User)
+def invalidate_user_cache(sender, instance, **kwargs):
+    """Сбрасывает кэшированный снимок измененного пользователя."""
+    user_cache.invalidate(instance.pk)
+
+
+def bump_list_version(model):
+    """Увеличивает версию данных модели и сообщает ее индексу фильтров."""
+    title_facet_index.note_version(model, bump_model_version(model))
+
+
+@receiver((post_save, post_delete), sender=Category)
+@receiver((post_save, post_delete), sender=Genre)
+@receiver((post_save, post_delete), sender=Title)
+@receiver((post_save, post_delete), sender=GenreTitle)
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_list_cache(sender, **kwargs):
+    """Делает устаревшими кэшированные ответы по данным модели.
+
+    Версия увеличивается после фиксации транзакции: иначе параллельный
+    запрос мог бы сохранить в кэше под новой версией еще прежние данные.
+    """
+    transaction.on_commit(partial(bump_list_version, sender))
+
+
+@receiver((post_save, post_delete), sender=Review)
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_parent_list(sender, instance, **kwargs):
+    """Меняет версию списка отзывов произведения или комментариев
+    отзыва, по которой вычисляется ETag списка."""
+    field = 'title' if sender is Review else 'review'
+    transaction.on_commit(partial(
+        bump_model_version,
+        sender, get_parent_scope(field, getattr(instance, f'{field}_id'))
+    ))
+
+
+@receiver(post_save, sender=Title)
+def update_title_index(sender, instance, **kwargs):
+    """Добавляет сохраненное произведение в индекс подсказок."""
+    title_index.update(instance.pk, instance.name)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_title_index(sender, instance, **kwargs):
+    """Удаляет произведение из индекса подсказок."""
+    title_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Title)
+def update_title_facet_index(sender, instance, **kwargs):
+    """Обновляет положение, год и категорию произведения в индексе
+    фильтров."""
+    title_facet_index.apply('with_title_changed', instance)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_title_facet_index(sender, instance, **kwargs):
+    """Удаляет произведение из индекса фильтров."""
+    title_facet_index.apply('without_title', instance.pk)
+
+
+@receiver((post_save, post_delete), sender=GenreTitle)
+def update_genre_title_facet_index(sender, instance, signal, **kwargs):
+    """Обновляет жанр произведения в индексе фильтров."""
+    title_facet_index.apply(
+        'with_genre_bit', instance.title_id, instance.genre_id,
+        signal is post_save
+    )
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def update_title_genres_facet_index(sender, instance, action, reverse,
+                                    pk_set, **kwargs):
+    """Обновляет жанры произведений в индексе фильтров."""
+    if action == 'post_clear':
+        title_facet_index.invalidate()
+    elif action in ('post_add', 'post_remove'):
+        for pk in pk_set:
+            title_id, genre_id = (
+                (pk, instance.pk) if reverse else (instance.pk, pk)
+            )
+            title_facet_index.apply(
+                'with_genre_bit', title_id, genre_id, action == 'post_add'
+            )
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def update_slug_facet_index(sender, instance, **kwargs):
+    """Добавляет жанр или категорию в индекс фильтров или меняет их slug."""
+    title_facet_index.apply(
+        'with_slug', sender._meta.model_name, instance.pk, instance.slug
+    )
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def remove_slug_from_facet_index(sender, instance, **kwargs):
+    """Удаляет жанр или категорию из индекса фильтров."""
+    title_facet_index.apply(
+        'without_slug', sender._meta.model_name, instance.pk
+    )
@@ -0,0 +1,114 @@
+import time
+from bisect import bisect_left, insort
+from threading import Lock
+
+from api_yamdb.constants import SUGGEST_INDEX_TTL
+from reviews.models import Title
+
+
+def normalize_name(name):
+    """Приводит название к виду для поиска по префиксу."""
+    return ' '.join(name.casefold().replace('ё', 'е').split())
+
+
+class TitlePrefixIndex:
+    """Отсортированный индекс названий произведений в памяти процесса.
+
+    Строится при первом обращении, обновляется сигналами сохранения
+    и удаления произведений и перестраивается раз в `ttl` секунд,
+    чтобы учесть изменения, сделанные другими процессами. Перестройка
+    читает базу данных без блокировки индекса: подсказки до ее конца
+    отдаются по прежнему состоянию, а изменения, пришедшие за это время,
+    повторяются на новом.
+    """
+
+    def __init__(self, ttl=SUGGEST_INDEX_TTL):
+        self.ttl = ttl
+        self._entries = []
+        self._keys = {}
+        self._built = None
+        self._pending = None
+        self._lock = Lock()
+        self._build_lock = Lock()
+
+    @staticmethod
+    def _build():
+        titles = Title.objects.values_list('id', 'name')
+        entries = sorted(
+            (normalize_name(name), title_id, name)
+            for title_id, name in titles
+        )
+        return entries, {entry[1]: entry for entry in entries}
+
+    def _is_stale(self):
+        return self._built is None or time.monotonic() - self._built > self.ttl
+
+    def _ensure_built(self):
+        if not self._is_stale():
+            return
+        # Первое построение ждут все запросы, а перестройку выполняет
+        # один из них, пока остальные читают прежнее состояние.
+        if not self._build_lock.acquire(blocking=self._built is None):
+            return
+        try:
+            if not self._is_stale():
+                return
+            with self._lock:
+                self._pending = []
+            entries, keys = self._build()
+            with self._lock:
+                self._entries, self._keys = entries, keys
+                for title_id, name in self._pending:
+                    self._apply(title_id, name)
+                self._pending = None
+                self._built = time.monotonic()
+        finally:
+            self._build_lock.release()
+
+    def suggest(self, query, limit):
+        """Возвращает до `limit` произведений, название которых
+        начинается с `query`."""
+        prefix = normalize_name(query)
+        if not prefix:
+            return []
+        self._ensure_built()
+        with self._lock:
+            position = bisect_left(self._entries, (prefix,))
+            suggestions = []
+            for key, title_id, name in self._entries[
+                    position:position + limit]:
+                if not key.startswith(prefix):
+                    break
+                suggestions.append({'id': title_id, 'name': name})
+            return suggestions
+
+    def _apply(self, title_id, name):
+        entry = self._keys.pop(title_id, None)
+        if entry is not None:
+            del self._entries[bisect_left(self._entries, entry)]
+        if name is not None:
+            entry = (normalize_name(name), title_id, name)
+            insort(self._entries, entry)
+            self._keys[title_id] = entry
+
+    def _change(self, title_id, name):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((title_id, name))
+            if self._built is not None:
+                self._apply(title_id, name)
+
+    def remove(self, title_id):
+        self._change(title_id, None)
+
+    def update(self, title_id, name):
+        self._change(title_id, name)
+
+    def reset(self):
+        with self._lock:
+            self._entries = []
+            self._keys = {}
+            self._built = None
+
+
+title_index = TitlePrefixIndex()
@@ -1,16 +1,43 @@
 import uuid
 
+from django.conf import settings
 from django.core.mail import send_mail
+from django.shortcuts import get_object_or_404
 
 from api_yamdb.settings import EMAIL_YAMDB
+from users.models import EmailOutbox
 
 
 def get_and_send_confirmation_code(user):
+    """Обновляет код подтверждения и отправляет его пользователю.
+
+    При включенной настройке `EMAIL_OUTBOX_ASYNC` письмо только
+    записывается в очередь исходящих писем, а отправляет его команда
+    `send_outbox_emails`.
+    """
     user.update(confirmation_code=str(uuid.uuid4()).split("-")[0])
-    send_mail(
-        'Код подтверждения',
-        (f'Код подтверждения для пользователя "{user[0].username}":'
-         f' {user[0].confirmation_code}'),
-        EMAIL_YAMDB,
-        [user[0].email]
-    )
+    subject = 'Код подтверждения'
+    message = (f'Код подтверждения для пользователя "{user[0].username}":'
+               f' {user[0].confirmation_code}')
+    if getattr(settings, 'EMAIL_OUTBOX_ASYNC', False):
+        EmailOutbox.objects.create(
+            subject=subject,
+            message=message,
+            from_email=EMAIL_YAMDB,
+            recipient=user[0].email
+        )
+        return
+    send_mail(subject, message, EMAIL_YAMDB, [user[0].email])
+
+
+def get_request_object(request, model, **lookup):
+    """Возвращает объект модели, загружая его не более раза за запрос.
+
+    Загруженные объекты хранятся на самом запросе, поэтому их разделяют
+    вьюсет, сериализаторы и проверки прав, обрабатывающие этот запрос.
+    """
+    cache = request.__dict__.setdefault('_request_objects', {})
+    key = (model, tuple(sorted(lookup.items())))
+    if key not in cache:
+        cache[key] = get_object_or_404(model, **lookup)
+    return cache[key]
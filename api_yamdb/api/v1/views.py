@@ -1,4 +1,4 @@
-from django.db.models import Avg
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, status, viewsets
@@ -7,8 +7,20 @@ from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 
-from api.v1.filters import TitleGenreFilter
-from api.v1.mixins import ListCreateDestroyViewSet
+from api.v1.cache import get_facets_cache_key
+from api.v1.facets import (
+    FACET_IGNORED_PARAMS,
+    FACET_MODELS,
+    count_title_facets,
+    title_facet_index
+)
+from api.v1.filters import (
+    StableOrderingFilter,
+    TitleGenreFilter,
+    TitleSearchFilter
+)
+from api.v1.mixins import ConditionalGetMixin, ListCreateDestroyViewSet
+from api.v1.pagination import CursorOrPageNumberPagination, TitlePagination
 from api.v1.permissions import (
     IsAdmin,
     IsAdminOrReadOnly,
@@ -25,21 +37,33 @@ from api.v1.serializers import (
     TitleSerializer,
     UserSerializer
 )
-from api.v1.utils import get_and_send_confirmation_code
+from api.v1.suggest import title_index
+from api.v1.utils import get_and_send_confirmation_code, get_request_object
+from api_yamdb.constants import LIST_CACHE_TIMEOUT, SUGGEST_LIMIT
 from reviews.models import Category, Genre, Review, Title
 from users.models import User
 
+COMMENT_FIELDS = (
+    'id', 'text', 'pub_date', 'updated', 'review', 'author__username'
+)
+REVIEW_FIELDS = (
+    'id', 'text', 'score', 'pub_date', 'updated', 'title', 'author__username'
+)
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет для обьектов модели Comment."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    pagination_class = CursorOrPageNumberPagination
     http_method_names = ('get', 'post', 'patch', 'delete')
+    parent_field = 'review'
 
     def get_review(self):
         """Возвращает объект текущего отзыва."""
-        return get_object_or_404(
+        return get_request_object(
+            self.request,
             Review,
             pk=self.kwargs['review_id'],
             title__id=self.kwargs['title_id'],
@@ -47,7 +71,9 @@ class CommentViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Возвращает queryset c комментариями для текущего отзыва."""
-        return self.get_review().comments.all()
+        return self.get_review().comments.select_related('author').only(
+            *COMMENT_FIELDS
+        )
 
     def perform_create(self, serializer):
         """Создает комментарий для текущего отзыва,
@@ -58,16 +84,20 @@ class CommentViewSet(viewsets.ModelViewSet):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """Вьюсет для обьектов модели Review."""
 
     http_method_names = ('get', 'post', 'patch', 'delete')
     serializer_class = ReviewSerializer
     permission_classes = (IsStaffOrAuthorOrReadOnly,)
+    pagination_class = CursorOrPageNumberPagination
+    parent_field = 'title'
 
     def get_title(self):
         """Возвращает объект текущего произведения."""
-        return get_object_or_404(Title, pk=self.kwargs['title_id'])
+        return get_request_object(
+            self.request, Title, pk=self.kwargs['title_id']
+        )
 
     def perform_create(self, serializer):
         """Создает отзыв для текущего произведения,
@@ -79,7 +109,9 @@ class ReviewViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Возвращает queryset c отзывами для текущего произведения."""
-        return self.get_title().reviews.all()
+        return self.get_title().reviews.select_related('author').only(
+            *REVIEW_FIELDS
+        )
 
 
 class CategoryViewSet(ListCreateDestroyViewSet, viewsets.GenericViewSet):
@@ -100,11 +132,16 @@ class TitleViewSet(viewsets.ModelViewSet):
     """Вьюсет для создания обьектов класса Title."""
 
     http_method_names = ('get', 'post', 'patch', 'delete')
-    queryset = Title.objects.annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name')
-    ordering_fields = ('name',)
-    filter_backends = (filters.OrderingFilter, DjangoFilterBackend,)
+    queryset = Title.objects.select_related(
+        'category'
+    ).prefetch_related('genre').order_by('name', 'id')
+    ordering_fields = ('name', 'year', 'rating')
+    pagination_class = TitlePagination
+    filter_backends = (
+        StableOrderingFilter,
+        DjangoFilterBackend,
+        TitleSearchFilter
+    )
     filterset_class = TitleGenreFilter
     permission_classes = (IsAdminOrReadOnly,)
 
@@ -115,6 +152,66 @@ class TitleViewSet(viewsets.ModelViewSet):
             return TitleGETSerializer
         return TitleSerializer
 
+    def list(self, request, *args, **kwargs):
+        """Отдает список произведений, отбирая их по индексу фильтров,
+        если он включен, и загружая из базы только текущую страницу."""
+        title_ids = None
+        if not self.paginator.use_cursor(request):
+            title_ids = title_facet_index.filter_request(request)
+        if title_ids is None:
+            return super().list(request, *args, **kwargs)
+        page = self.paginate_queryset(title_ids)
+        titles = self.get_queryset().in_bulk(page)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in page if pk in titles], many=True
+        )
+        return self.get_paginated_response(serializer.data)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='facets',
+        url_name='facets'
+    )
+    def facets(self, request):
+        """Считает подходящие под фильтры запроса произведения
+        по жанрам, категориям и интервалам лет."""
+        params = {
+            key: value for key, value in request.query_params.items()
+            if key not in FACET_IGNORED_PARAMS
+        }
+        key = get_facets_cache_key(FACET_MODELS, params)
+        facets = cache.get(key)
+        if facets is None:
+            title_ids = title_facet_index.filter_request(request)
+            if title_ids is None:
+                facets = count_title_facets(
+                    self.filter_queryset(self.get_queryset())
+                )
+            else:
+                facets = title_facet_index.count_facets(title_ids)
+            cache.set(key, facets, LIST_CACHE_TIMEOUT)
+        return Response(facets, status=status.HTTP_200_OK)
+
+    @action(
+        detail=False,
+        methods=('get',),
+        url_path='suggest',
+        url_name='suggest'
+    )
+    def suggest(self, request):
+        """Подсказывает произведения по началу названия
+        без запросов к базе данных."""
+        try:
+            limit = int(request.query_params.get('limit'))
+            limit = max(1, min(limit, SUGGEST_LIMIT))
+        except (TypeError, ValueError):
+            limit = SUGGEST_LIMIT
+        return Response(
+            title_index.suggest(request.query_params.get('q', ''), limit),
+            status=status.HTTP_200_OK
+        )
+
 
 class UserViewSet(viewsets.ModelViewSet):
     """Вьюсет для обьектов модели User."""
@@ -137,15 +234,16 @@ class UserViewSet(viewsets.ModelViewSet):
     def get_me_data(self, request):
         """Позволяет пользователю получить подробную информацию о себе
         и редактировать её."""
+        user = User.objects.get(pk=request.user.pk)
         if request.method == 'PATCH':
             serializer = UserSerializer(
-                request.user, data=request.data,
+                user, data=request.data,
                 partial=True, context={'request': request}
             )
             serializer.is_valid(raise_exception=True)
-            serializer.save(role=request.user.role)
+            serializer.save(role=user.role)
             return Response(serializer.data, status=status.HTTP_200_OK)
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
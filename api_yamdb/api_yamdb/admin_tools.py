@@ -0,0 +1,97 @@
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
+
+from api_yamdb.constants import APPROXIMATE_COUNT_THRESHOLD
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Фильтр боковой панели с полем ввода вместо списка вариантов.
+
+    Не загружает из базы данных значения для боковой панели,
+    поэтому подходит для полей с большим количеством вариантов.
+    """
+
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        """Возвращает непустой набор, без него фильтр не отображается."""
+        return ((),)
+
+    def choices(self, changelist):
+        """Передает в шаблон остальные параметры фильтрации страницы."""
+        all_choice = next(super().choices(changelist))
+        all_choice['query_parts'] = (
+            (key, value)
+            for key, value in changelist.get_filters_params().items()
+            if key != self.parameter_name
+        )
+        yield all_choice
+
+
+class AuthorFilter(InputFilter):
+    """Фильтр записей по имени пользователя автора."""
+
+    parameter_name = 'author'
+    title = 'автору'
+
+    def queryset(self, request, queryset):
+        """Оставляет записи автора с указанным именем пользователя."""
+        if self.value():
+            return queryset.filter(author__username=self.value())
+        return queryset
+
+
+class UsernameFilter(InputFilter):
+    """Фильтр пользователей по началу имени пользователя."""
+
+    parameter_name = 'username'
+    title = 'имени пользователя'
+
+    def queryset(self, request, queryset):
+        """Оставляет пользователей, имя которых начинается с запроса."""
+        if self.value():
+            return queryset.filter(username__istartswith=self.value())
+        return queryset
+
+
+def get_table_size_estimate(model):
+    """Оценивает количество строк в таблице модели без COUNT(*).
+
+    PostgreSQL хранит оценку в статистике планировщика,
+    для остальных баз данных используется максимальный первичный ключ,
+    который читается из индекса.
+    """
+    connection = connections[model.objects.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE relname = %s',
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] > 0 else None
+    return model.objects.aggregate(size=Max('pk'))['size']
+
+
+class ApproximateCountPaginator(Paginator):
+    """Пагинатор, не считающий строки больших нефильтрованных таблиц.
+
+    Для страницы без фильтров и поиска количество записей берется
+    из оценки размера таблицы, если она превышает
+    APPROXIMATE_COUNT_THRESHOLD. В остальных случаях выполняется
+    обычный COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        """Возвращает точное или приблизительное количество записей."""
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+        estimate = get_table_size_estimate(self.object_list.model)
+        if estimate is None or estimate < APPROXIMATE_COUNT_THRESHOLD:
+            return super().count
+        return estimate
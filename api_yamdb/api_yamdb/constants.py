@@ -1,10 +1,26 @@
+APPROXIMATE_COUNT_THRESHOLD = 10000
 CATEGORY_GENRE_NAME_LENGTH = 256
 EMAIL_MAX_LENGTH = 254
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+EMAIL_SUBJECT_MAX_LENGTH = 255
+FACET_INDEX_TTL = 300
+FACET_YEAR_BUCKET = 10
+IMPORT_CHECKSUM_LENGTH = 64
+IMPORT_TABLE_NAME_LENGTH = 64
 LENGTH_TEXT = 15
+LIST_CACHE_TIMEOUT = 300
 MAX_SEARCH_RESULTS = 10
+METRICS_FLUSH_INTERVAL = 5
+PROFILE_STATS_LIMIT = 30
 RATING_DEFAULT = 0
 RATING_MAX = 10
 RATING_MIN = 1
 RESTRICTED_USERNAMES = ('me',)
+SUGGEST_INDEX_TTL = 300
+SUGGEST_LIMIT = 10
 TITLE_NAME_LENGTH = 256
+USER_CACHE_MAX_SIZE = 10000
+USER_CACHE_TTL = 60
 USERNAME_MAX_LENGTH = 150
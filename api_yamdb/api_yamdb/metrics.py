@@ -0,0 +1,290 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from api_yamdb.constants import METRICS_FLUSH_INTERVAL
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'
+OTHER_METHOD = 'other'
+HTTP_METHODS = (
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE'
+)
+
+# Имя метрики: тип, описание и границы корзин для гистограмм.
+METRICS = {
+    'yamdb_http_requests_total': (
+        'counter', 'Количество обработанных запросов.', None
+    ),
+    'yamdb_http_errors_total': (
+        'counter', 'Количество запросов, завершившихся ошибкой 5xx.', None
+    ),
+    'yamdb_db_queries_total': (
+        'counter', 'Количество запросов к базе данных.', None
+    ),
+    'yamdb_http_request_duration_seconds': (
+        'histogram', 'Время обработки запроса в секундах.',
+        (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+    ),
+    'yamdb_http_response_size_bytes': (
+        'histogram', 'Размер тела ответа в байтах.',
+        (100, 1000, 10000, 100000, 1000000)
+    ),
+}
+
+
+class MetricsRegistry:
+    """Счетчики метрик процесса с выгрузкой в общий каталог.
+
+    Каждый поток пишет в собственный словарь, поэтому запись метрики —
+    это только увеличение значения без блокировок. Фоновый поток раз в
+    METRICS_FLUSH_INTERVAL секунд сохраняет сумму по потокам в файл
+    процесса в каталоге METRICS_DIR, а ответ /metrics складывает файлы
+    всех процессов. Имя файла содержит PID и время запуска процесса,
+    поэтому процесс с повторно выданным PID не перезаписывает счетчики
+    завершившегося. Файлы завершившихся процессов продолжают учитываться,
+    чтобы счетчики не уменьшались; каталог очищается при перезапуске
+    сервера.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Сбрасывает все значения текущего процесса."""
+        self._pid = os.getpid()
+        self._started = time.time_ns()
+        self._local = threading.local()
+        self._shards = []
+        self._flusher = None
+
+    def _get_shard(self):
+        if self._pid != os.getpid():
+            # Процесс создан через fork: значения и фоновый поток
+            # родителя к нему не относятся.
+            self.reset()
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = defaultdict(float)
+            with self._lock:
+                self._shards.append(shard)
+                self._start_flusher()
+        return shard
+
+    def inc(self, name, labels, value=1):
+        """Увеличивает счетчик с набором меток `labels`."""
+        self._get_shard()[name, labels] += value
+
+    def observe(self, name, labels, value):
+        """Добавляет значение в гистограмму с набором меток `labels`."""
+        buckets = METRICS[name][2]
+        shard = self._get_shard()
+        shard[f'{name}_bucket', labels, bisect_left(buckets, value)] += 1
+        shard[f'{name}_sum', labels] += value
+
+    def snapshot(self):
+        """Возвращает сумму значений всех потоков процесса."""
+        totals = defaultdict(float)
+        for shard in list(self._shards):
+            for key, value in dict(shard).items():
+                totals[key] += value
+        return totals
+
+    @property
+    def file_name(self):
+        return os.path.join(
+            settings.METRICS_DIR, f'metrics-{self._pid}-{self._started}.json'
+        )
+
+    def _start_flusher(self):
+        if self._flusher is not None or not settings.METRICS_DIR:
+            return
+        self._flusher = threading.Thread(
+            target=self._flush_forever, name='metrics-flusher', daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(METRICS_FLUSH_INTERVAL)
+            self.flush()
+
+    def flush(self):
+        """Сохраняет значения процесса в его файл в METRICS_DIR."""
+        if not settings.METRICS_DIR:
+            return
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        temporary = f'{self.file_name}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(
+                [[*key, value] for key, value in self.snapshot().items()],
+                file
+            )
+        os.replace(temporary, self.file_name)
+
+    def collect(self):
+        """Возвращает значения, сложенные по всем процессам."""
+        totals = self.snapshot()
+        if not settings.METRICS_DIR:
+            return totals
+        own_file = self.file_name
+        for file_name in glob.glob(
+                os.path.join(settings.METRICS_DIR, 'metrics-*.json')):
+            if file_name == own_file:
+                continue
+            try:
+                with open(file_name) as file:
+                    samples = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for *key, value in samples:
+                key[1] = tuple(tuple(label) for label in key[1])
+                totals[tuple(key)] += value
+        return totals
+
+
+registry = MetricsRegistry()
+
+
+def format_labels(labels):
+    """Форматирует метки в синтаксисе Prometheus."""
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', '\\\\').replace('"', '\\"')
+        )
+        for name, value in labels
+    )
+    return f'{{{pairs}}}'
+
+
+def format_value(value):
+    """Форматирует значение без лишней дробной части."""
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def render_metrics(totals):
+    """Формирует текст ответа в формате Prometheus."""
+    families = defaultdict(list)
+    for key, value in totals.items():
+        families[key[0]].append((key[1:], value))
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        if kind == 'counter':
+            for (labels,), value in sorted(families[name]):
+                lines.append(
+                    f'{name}{format_labels(labels)} {format_value(value)}'
+                )
+            continue
+        counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        for (labels, index), value in families[f'{name}_bucket']:
+            counts[labels][index] += value
+        sums = {
+            labels: value for (labels,), value in families[f'{name}_sum']
+        }
+        bounds = (*map(format_value, buckets), '+Inf')
+        for labels in sorted(counts):
+            cumulative = 0
+            for bound, value in zip(bounds, counts[labels]):
+                cumulative += value
+                bucket_labels = format_labels((*labels, ('le', bound)))
+                lines.append(
+                    f'{name}_bucket{bucket_labels} '
+                    f'{format_value(cumulative)}'
+                )
+            lines.append(
+                f'{name}_sum{format_labels(labels)} '
+                f'{format_value(sums.get(labels, 0))}'
+            )
+            lines.append(
+                f'{name}_count{format_labels(labels)} '
+                f'{format_value(cumulative)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def is_metrics_access_allowed(request):
+    """Проверяет адрес клиента по METRICS_ALLOWED_IPS или токен
+    METRICS_TOKEN в заголовке Authorization."""
+    if settings.METRICS_TOKEN and constant_time_compare(
+            request.headers.get('Authorization', ''),
+            f'Bearer {settings.METRICS_TOKEN}'):
+        return True
+    return request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+
+
+def metrics_view(request):
+    """Отдает метрики всех процессов в формате Prometheus."""
+    if not is_metrics_access_allowed(request):
+        raise PermissionDenied
+    return HttpResponse(
+        render_metrics(registry.collect()), content_type=CONTENT_TYPE
+    )
+
+
+class QueryCounter:
+    """Считает запросы к базе данных во время обработки запроса."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+class MetricsMiddleware:
+    """Записывает метрики запроса по имени его маршрута."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - started
+        match = request.resolver_match
+        route = match.view_name if match else UNMATCHED_ROUTE
+        method = (
+            request.method if request.method in HTTP_METHODS
+            else OTHER_METHOD
+        )
+        labels = (('method', method), ('route', route))
+        registry.inc(
+            'yamdb_http_requests_total',
+            labels + (('status', str(response.status_code)),)
+        )
+        if response.status_code >= 500:
+            registry.inc('yamdb_http_errors_total', labels)
+        registry.inc('yamdb_db_queries_total', labels, queries.count)
+        registry.observe(
+            'yamdb_http_request_duration_seconds', labels, duration
+        )
+        if not response.streaming:
+            registry.observe(
+                'yamdb_http_response_size_bytes', labels,
+                len(response.content)
+            )
+        return response
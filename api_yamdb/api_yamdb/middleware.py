@@ -0,0 +1,148 @@
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework.exceptions import AuthenticationFailed
+
+from api_yamdb.constants import PROFILE_STATS_LIMIT
+from api_yamdb.timing import RequestTiming, current_timing
+
+logger = logging.getLogger(__name__)
+
+
+class ServerTimingMiddleware:
+    """Замеряет запросы к базе данных, сериализацию и рендеринг ответа.
+
+    Замеры добавляются в заголовок Server-Timing и пишутся в лог одной
+    строкой JSON. Замеряется доля запросов SERVER_TIMING_SAMPLE_RATE;
+    при нулевой доле middleware отключается.
+    """
+
+    def __init__(self, get_response):
+        self.sample_rate = getattr(settings, 'SERVER_TIMING_SAMPLE_RATE', 0)
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        timing = RequestTiming()
+        token = current_timing.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(timing.execute_wrapper)
+                    )
+                response = self.get_response(request)
+        finally:
+            current_timing.reset(token)
+        timing.add('total', started)
+        response['Server-Timing'] = self.get_header(timing)
+        logger.info(json.dumps({
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': timing.queries,
+            **{
+                f'{metric}_ms': round(duration, 2)
+                for metric, duration in timing.durations.items()
+            },
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        """Замеряет рендеринг ответа, который выполняется после этого
+        метода."""
+        timing = current_timing.get()
+        if timing is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: timing.add('render', started)
+            )
+        return response
+
+    @staticmethod
+    def get_header(timing):
+        """Формирует значение заголовка Server-Timing."""
+        metrics = [
+            f'{metric};dur={duration:.2f}'
+            for metric, duration in timing.durations.items()
+        ]
+        metrics.append(f'queries;desc="{timing.queries}"')
+        return ', '.join(metrics)
+
+
+class ProfilerMiddleware:
+    """Профилирует запрос администратора с заголовком X-Profile.
+
+    Результат профилирования сохраняется в каталог PROFILE_DIR в виде
+    файла .prof для pstats и snakeviz и текстовой сводки с самыми
+    затратными функциями. Имя файла возвращается в заголовке
+    X-Profile-File. Запросы без заголовка не профилируются и
+    не аутентифицируются повторно.
+    """
+
+    header = 'HTTP_X_PROFILE'
+
+    def __init__(self, get_response):
+        self.profile_dir = getattr(settings, 'PROFILE_DIR', None)
+        if not self.profile_dir:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if self.header not in request.META or not self.is_admin(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        response = profiler.runcall(self.get_response, request)
+        response['X-Profile-File'] = self.save(profiler, request)
+        return response
+
+    @staticmethod
+    def is_admin(request):
+        """Проверяет, что запрос отправлен администратором.
+
+        Пользователь определяется по JWT-токену, как в API,
+        или по сессии, как в админке.
+        """
+        from api.v1.authentication import CachedJWTAuthentication
+
+        try:
+            credentials = CachedJWTAuthentication().authenticate(request)
+        except AuthenticationFailed:
+            return False
+        user = credentials[0] if credentials else request.user
+        return user.is_authenticated and user.is_admin
+
+    def save(self, profiler, request):
+        """Сохраняет профиль и сводку, возвращает имя файла профиля."""
+        os.makedirs(self.profile_dir, exist_ok=True)
+        name = '{}-{}-{}'.format(
+            timezone.now().strftime('%Y%m%d%H%M%S%f'),
+            request.method.lower(),
+            slugify(request.path) or 'root'
+        )
+        path = os.path.join(self.profile_dir, name)
+        profiler.dump_stats(f'{path}.prof')
+        summary = io.StringIO()
+        pstats.Stats(profiler, stream=summary).sort_stats(
+            pstats.SortKey.CUMULATIVE
+        ).print_stats(PROFILE_STATS_LIMIT)
+        with open(f'{path}.txt', 'w') as file:
+            file.write(f'{request.method} {request.get_full_path()}\n')
+            file.write(summary.getvalue())
+        return f'{name}.prof'
@@ -0,0 +1,162 @@
+import logging
+import os
+import re
+import sys
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.serializers import BaseSerializer
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+SQL_IN_LISTS = re.compile(r'\bIN \((?:[^()]*)\)', re.IGNORECASE)
+
+
+class NPlusOneError(Exception):
+    """Повторяющиеся однотипные запросы к базе данных."""
+
+
+def normalize_sql(sql):
+    """Заменяет значения в SQL-запросе, оставляя только его форму."""
+    sql = SQL_LITERALS.sub('?', sql)
+    return SQL_IN_LISTS.sub('IN (...)', sql)
+
+
+def is_project_file(file_name):
+    """Проверяет, что файл относится к коду проекта, а не к библиотекам."""
+    file_name = os.path.abspath(file_name)
+    return (
+        file_name.startswith(str(settings.BASE_DIR))
+        and 'site-packages' not in file_name
+        and file_name != os.path.abspath(__file__)
+    )
+
+
+def get_view_name(view):
+    """Возвращает имя представления API и его действия."""
+    action = getattr(view, 'action', None)
+    return type(view).__name__ + (f'.{action}' if action else '')
+
+
+def get_query_origin(frame):
+    """Определяет место вызова запроса и ответственный за него код.
+
+    Возвращает пару: строку кода проекта, из которой выполнен запрос,
+    и поле сериализатора либо представление, во время работы которого
+    он выполнен.
+    """
+    call_site = owner = None
+    while frame is not None and (call_site is None or owner is None):
+        code = frame.f_code
+        if call_site is None and is_project_file(code.co_filename):
+            call_site = (
+                f'{os.path.relpath(code.co_filename, settings.BASE_DIR)}:'
+                f'{frame.f_lineno} in {code.co_name}'
+            )
+        instance = frame.f_locals.get('self')
+        if owner is None and isinstance(instance, BaseSerializer):
+            field = frame.f_locals.get('field')
+            field_name = getattr(field, 'field_name', None)
+            if field_name is not None:
+                owner = f'{type(instance).__name__}.{field_name}'
+        elif owner is None and isinstance(instance, APIView):
+            owner = get_view_name(instance)
+        frame = frame.f_back
+    return call_site, owner
+
+
+class QueryGroup:
+    """Однотипные запросы, выполненные из одного места кода."""
+
+    def __init__(self, sql, call_site, owner):
+        self.sql = sql
+        self.call_site = call_site
+        self.owner = owner
+        self.count = 0
+
+    def __str__(self):
+        return (
+            f'{self.count} однотипных запросов из {self.call_site} '
+            f'({self.owner}): {self.sql}'
+        )
+
+
+class NPlusOneDetector:
+    """Группирует SELECT-запросы по форме и месту вызова.
+
+    Группы, в которых не меньше `threshold` запросов, считаются
+    проблемой N+1.
+    """
+
+    def __init__(self, threshold=None):
+        if threshold is None:
+            threshold = settings.NPLUSONE_THRESHOLD
+        self.threshold = threshold
+        self.groups = defaultdict(dict)
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Запоминает форму и место вызова каждого SELECT-запроса."""
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            normalized = normalize_sql(sql)
+            call_site, owner = get_query_origin(sys._getframe(1))
+            group = self.groups[normalized].get(call_site)
+            if group is None:
+                group = self.groups[normalized][call_site] = QueryGroup(
+                    normalized, call_site, owner or call_site
+                )
+            group.count += 1
+        return execute(sql, params, many, context)
+
+    @contextmanager
+    def capture(self):
+        """Подключает детектор ко всем соединениям с базой данных."""
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(self.execute_wrapper)
+                )
+            yield self
+
+    @property
+    def problems(self):
+        """Возвращает группы запросов, превысившие порог."""
+        return [
+            group
+            for call_sites in self.groups.values()
+            for group in call_sites.values()
+            if group.count >= self.threshold
+        ]
+
+    def report(self):
+        """Возвращает описание найденных проблем или пустую строку."""
+        return '\n'.join(str(group) for group in self.problems)
+
+
+class NPlusOneMiddleware:
+    """Ищет проблемы N+1 в запросах к API.
+
+    Включается настройкой NPLUSONE_DETECTOR. Найденные проблемы пишутся
+    в лог, а при NPLUSONE_RAISE приводят к ошибке NPlusOneError.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_DETECTOR:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = NPlusOneDetector()
+        with detector.capture():
+            response = self.get_response(request)
+        report = detector.report()
+        if report:
+            message = f'N+1 в {request.method} {request.path}:\n{report}'
+            if settings.NPLUSONE_RAISE:
+                raise NPlusOneError(message)
+            logger.warning(message)
+        return response
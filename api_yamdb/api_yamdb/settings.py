@@ -30,11 +30,15 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api_yamdb.middleware.ServerTimingMiddleware',
+    'api_yamdb.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'api_yamdb.middleware.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -71,6 +75,17 @@ DATABASES = {
 }
 
 
+# Cache
+# Локальный кэш у каждого процесса свой; при запуске нескольких
+# процессов укажите общий бэкенд (например, Redis или Memcached).
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -117,7 +132,7 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.v1.authentication.CachedJWTAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
@@ -129,6 +144,76 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
 
+# Доля запросов, для которых в заголовок Server-Timing и в лог
+# пишутся количество запросов к базе данных и время обработки;
+# 0 отключает замеры, 1 включает их для всех запросов.
+SERVER_TIMING_SAMPLE_RATE = 0
+
+# Каталог для профилей запросов администраторов с заголовком
+# `X-Profile: 1`; None отключает профилирование.
+PROFILE_DIR = os.path.join(BASE_DIR, 'profiles')
+
+# Поиск проблем N+1: однотипные SELECT-запросы, выполненные из одного
+# места кода не менее NPLUSONE_THRESHOLD раз за запрос, пишутся в лог
+# или, при NPLUSONE_RAISE, приводят к ошибке.
+NPLUSONE_DETECTOR = False
+NPLUSONE_RAISE = False
+NPLUSONE_THRESHOLD = 3
+
+# Запросы к базе данных дольше SLOW_QUERY_THRESHOLD_MS миллисекунд
+# пишутся с планом выполнения в файл SLOW_QUERY_LOG_FILE; None в любой
+# из этих настроек отключает журнал.
+SLOW_QUERY_THRESHOLD_MS = 100
+SLOW_QUERY_LOG_FILE = os.path.join(BASE_DIR, 'slow_queries.log')
+
+# Каталог, через который процессы сервера складывают метрики для
+# /metrics. При запуске нескольких процессов укажите общий для них
+# каталог и очищайте его при перезапуске сервера; None оставляет в ответе
+# метрики только текущего процесса.
+METRICS_DIR = None
+# /metrics доступен с адресов METRICS_ALLOWED_IPS или с заголовком
+# `Authorization: Bearer <METRICS_TOKEN>`.
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')
+METRICS_TOKEN = None
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+        'slow_queries': {
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': SLOW_QUERY_LOG_FILE,
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'encoding': 'utf-8',
+            'delay': True,
+        } if SLOW_QUERY_LOG_FILE is not None else {
+            'class': 'logging.NullHandler',
+        },
+    },
+    'loggers': {
+        'api_yamdb': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'api_yamdb.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+# Индекс фильтров произведений в памяти процесса: фильтры по жанру,
+# категории и году вычисляются битовыми операциями без запросов к базе.
+TITLE_FACET_INDEX = False
+
 EMAIL_YAMDB = 'registration@mail.ru'
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Письма с кодом подтверждения складываются в очередь и отправляются
+# командой `python manage.py send_outbox_emails`.
+EMAIL_OUTBOX_ASYNC = True
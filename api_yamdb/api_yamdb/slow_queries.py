@@ -0,0 +1,95 @@
+import json
+import logging
+import sys
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from rest_framework.views import APIView
+
+from api_yamdb.nplusone import get_query_origin, get_view_name
+
+logger = logging.getLogger(__name__)
+
+EXPLAINABLE_STATEMENTS = {'SELECT', 'UPDATE', 'DELETE', 'WITH'}
+
+# Запросы EXPLAIN выполняются через тот же курсор и не должны попадать
+# в журнал сами.
+explaining = ContextVar('explaining', default=False)
+
+
+def get_calling_view(frame):
+    """Возвращает имя представления API, выполнившего запрос."""
+    while frame is not None:
+        instance = frame.f_locals.get('self')
+        if isinstance(instance, APIView):
+            return get_view_name(instance)
+        frame = frame.f_back
+    return None
+
+
+def explain(connection, sql, params):
+    """Возвращает план выполнения запроса или текст ошибки.
+
+    EXPLAIN выполняется в точке сохранения, поэтому его ошибка не
+    прерывает транзакцию, в которой выполнялся исходный запрос.
+    """
+    statement = sql.split(None, 1)[:1]
+    if not statement or statement[0].upper() not in EXPLAINABLE_STATEMENTS:
+        return None
+    prefix = (
+        'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    )
+    token = explaining.set(True)
+    try:
+        with transaction.atomic(using=connection.alias), \
+                connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return [
+                ' '.join(str(value) for value in row)
+                for row in cursor.fetchall()
+            ]
+    except DatabaseError as error:
+        return f'EXPLAIN недоступен: {error}'
+    finally:
+        explaining.reset(token)
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """Пишет в журнал запросы дольше SLOW_QUERY_THRESHOLD_MS."""
+    if explaining.get():
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_THRESHOLD_MS:
+            frame = sys._getframe(1)
+            call_site, _ = get_query_origin(frame)
+            connection = context['connection']
+            logger.warning(json.dumps({
+                'duration_ms': round(duration, 2),
+                'sql': sql,
+                'params': params,
+                'view': get_calling_view(frame),
+                'call_site': call_site,
+                'plan': None if many else explain(connection, sql, params),
+            }, ensure_ascii=False, default=str))
+
+
+def install_slow_query_log(sender, connection, **kwargs):
+    """Подключает журнал медленных запросов к новому соединению.
+
+    Соединение открывается лениво, часто внутри запроса, когда
+    промежуточные слои уже подключили свои обертки через
+    connection.execute_wrapper(). Выходя из контекста, они удаляют
+    последнюю обертку списка, поэтому журнал ставится в его начало.
+    """
+    if (
+        settings.SLOW_QUERY_THRESHOLD_MS is not None
+        and settings.SLOW_QUERY_LOG_FILE is not None
+        and log_slow_query not in connection.execute_wrappers
+    ):
+        connection.execute_wrappers.insert(0, log_slow_query)
@@ -0,0 +1,43 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Замеры текущего запроса; None, если запрос не попал в выборку.
+current_timing = ContextVar('current_timing', default=None)
+
+
+class RequestTiming:
+    """Замеры времени одного запроса в миллисекундах."""
+
+    METRICS = ('db', 'serializer', 'render', 'total')
+
+    def __init__(self):
+        self.queries = 0
+        self.durations = dict.fromkeys(self.METRICS, 0.0)
+        self._depth = dict.fromkeys(self.METRICS, 0)
+
+    def add(self, metric, started):
+        """Добавляет к метрике время, прошедшее с момента `started`."""
+        self.durations[metric] += (time.perf_counter() - started) * 1000
+
+    def execute_wrapper(self, execute, sql, params, many, context):
+        """Считает запросы к базе данных и время их выполнения."""
+        self.queries += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.add('db', started)
+
+    @contextmanager
+    def measure(self, metric):
+        """Замеряет блок кода; вложенные замеры той же метрики не
+        учитываются повторно."""
+        self._depth[metric] += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[metric] -= 1
+            if not self._depth[metric]:
+                self.add(metric, started)
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.urls import include, path
 from django.views.generic import TemplateView
 
+from api_yamdb.metrics import metrics_view
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path(
@@ -9,5 +11,6 @@ urlpatterns = [
         TemplateView.as_view(template_name='redoc.html'),
         name='redoc'
     ),
-    path('api/', include('api.urls'))
+    path('api/', include('api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
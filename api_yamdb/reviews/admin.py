@@ -1,6 +1,6 @@
 from django.contrib import admin
-from django.db.models import Avg
 
+from api_yamdb.admin_tools import ApproximateCountPaginator, AuthorFilter
 from api_yamdb.constants import MAX_SEARCH_RESULTS, RATING_DEFAULT
 from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
 
@@ -51,25 +51,31 @@ class TitleAdmin(admin.ModelAdmin):
     )
     list_filter = ('name',)
     list_per_page = MAX_SEARCH_RESULTS
+    list_select_related = ('category',)
     search_fields = ('name', 'year', 'category')
 
+    def get_queryset(self, request):
+        """Загружает жанры произведений страницы одним запросом."""
+        return super().get_queryset(request).prefetch_related('genre')
+
     @admin.display(description='Жанр/ы произведения')
     def get_genre(self, object):
         """Получает жанр или список жанров произведения."""
         return '\n'.join((genre.name for genre in object.genre.all()))
 
-    @admin.display(description='Количество отзывов')
+    @admin.display(description='Количество отзывов', ordering='rating_count')
     def count_reviews(self, object):
-        """Вычисляет количество отзывов на произведение."""
+        """Возвращает сохраненное количество отзывов на произведение."""
 
-        return object.reviews.count()
+        return object.rating_count
 
-    @admin.display(description='Рейтинг')
+    @admin.display(description='Рейтинг', ordering='rating')
     def get_rating(self, object):
-        """Вычисляет рейтинг произведения."""
+        """Возвращает сохраненный рейтинг произведения."""
 
-        rating = object.reviews.aggregate(average_score=Avg('score'))
-        return round(rating.get('average_score'), RATING_DEFAULT)
+        if object.rating is None:
+            return None
+        return round(object.rating, RATING_DEFAULT)
 
 
 @admin.register(GenreTitle)
@@ -83,6 +89,7 @@ class GenreTitleAdmin(admin.ModelAdmin):
     )
     list_filter = ('genre',)
     list_per_page = MAX_SEARCH_RESULTS
+    list_select_related = ('genre', 'title')
     search_fields = ('title',)
 
 
@@ -98,9 +105,13 @@ class ReviewAdmin(admin.ModelAdmin):
         'pub_date',
         'title'
     )
-    list_filter = ('author', 'score', 'pub_date')
+    autocomplete_fields = ('author',)
+    list_filter = (AuthorFilter, 'score', 'pub_date')
     list_per_page = MAX_SEARCH_RESULTS
+    list_select_related = ('author', 'title')
+    paginator = ApproximateCountPaginator
     search_fields = ('author__username',)
+    show_full_result_count = False
 
 
 @admin.register(Comment)
@@ -114,9 +125,13 @@ class CommentAdmin(admin.ModelAdmin):
         'pub_date',
         'review'
     )
-    list_filter = ('author', 'pub_date')
+    autocomplete_fields = ('author',)
+    list_filter = (AuthorFilter, 'pub_date')
     list_per_page = MAX_SEARCH_RESULTS
+    list_select_related = ('author', 'review')
+    paginator = ApproximateCountPaginator
     search_fields = ('author__username',)
+    show_full_result_count = False
 
 
 admin.site.site_title = 'Администрирование YaMDb'
@@ -1,20 +1,38 @@
 import csv
+import hashlib
 import os
+import pickle
+import time
+from argparse import ArgumentTypeError
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from graphlib import TopologicalSorter
+from itertools import islice
+from tempfile import NamedTemporaryFile, TemporaryDirectory
 
+import django
+from django.apps import apps
+from django.core.exceptions import ValidationError
 from django.core.management import BaseCommand
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 
 from reviews.models import (
     Category,
     Comment,
     Genre,
     GenreTitle,
+    ImportState,
     Review,
     Title
 )
+from reviews.management.commands.recalculate_ratings import (
+    recalculate_ratings
+)
 from users.models import User
 
+BATCH_SIZE = 1000
+
 FILES_CLASSES = {
     'category': Category,
     'genre': Genre,
@@ -36,6 +54,19 @@ FIELDS = {
 print_console = BaseCommand().stdout.write
 
 
+def positive_int(value):
+    """Разбирает целое положительное значение аргумента команды."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise ArgumentTypeError(
+            f'ожидается целое положительное число, получено {value!r}'
+        )
+    return number
+
+
 def open_csv_file(file_name):
     """Менеджер контекста для открытия csv-файлов."""
     csv_file = file_name + '.csv'
@@ -48,6 +79,25 @@ def open_csv_file(file_name):
         return
 
 
+def read_csv_rows(file_name):
+    """Построчно читает csv-файл, возвращая строки в виде словарей."""
+    csv_file = file_name + '.csv'
+    csv_path = os.path.join(settings.CSV_FILES_DIR, csv_file)
+    try:
+        with open(csv_path, encoding='utf-8', newline='') as file:
+            yield from csv.DictReader(file)
+    except FileNotFoundError:
+        print_console(f'Файл {csv_file} не найден.')
+
+
+def change_foreign_ids(data_csv):
+    """Заменяет ключи внешних связей на поля `*_id` без запросов к базе."""
+    return {
+        (f'{FIELDS[key][0]}_id' if key in FIELDS else key): value
+        for key, value in data_csv.items()
+    }
+
+
 def change_foreign_values(data_csv):
     """Метод для изменения значений."""
     data_csv_copy = data_csv.copy()
@@ -78,10 +128,310 @@ def load_csv(file_name, class_name):
     print_console(table_loaded)
 
 
+def get_tables_dependencies():
+    """Строит граф зависимостей таблиц по внешним ключам моделей."""
+    tables = {model: key for key, model in FILES_CLASSES.items()}
+    return {
+        key: {
+            tables[field.related_model]
+            for field in model._meta.concrete_fields
+            if field.is_relation
+            and field.related_model in tables
+            and field.related_model is not model
+        }
+        for key, model in FILES_CLASSES.items()
+    }
+
+
+def clean_csv_value(field, value):
+    """Приводит строковое значение из csv-файла к типу поля модели."""
+    if value == '' and field.null:
+        return None
+    return field.to_python(value)
+
+
+def setup_worker():
+    """Настраивает Django в процессе, запущенном не через fork."""
+    if not apps.ready:
+        django.setup()
+
+
+def get_model_fields(class_name):
+    """Возвращает поля модели, хранящиеся в базе данных, по их столбцам."""
+    return {
+        field.attname: field for field in class_name._meta.concrete_fields
+    }
+
+
+def clean_csv_row(fields, row):
+    """Проверяет строку csv-файла и приводит ее к значениям полей модели."""
+    values = change_foreign_ids(row)
+    unknown = values.keys() - fields.keys()
+    if unknown:
+        raise ValidationError(
+            f'Неизвестные столбцы: {", ".join(sorted(unknown))}.'
+        )
+    return {
+        key: clean_csv_value(fields[key], value)
+        for key, value in values.items()
+    }
+
+
+def parse_csv_file(file_name, model_label, batch_size, directory):
+    """Читает и проверяет csv-файл, сохраняя значения полей модели
+    пакетами во временный файл в каталоге `directory`.
+
+    Возвращает путь к временному файлу, поэтому ни процесс пула,
+    ни основной процесс не держат таблицу в памяти целиком.
+    """
+    fields = get_model_fields(apps.get_model(model_label))
+    rows = read_csv_rows(file_name)
+    with NamedTemporaryFile(dir=directory, delete=False) as file:
+        try:
+            while True:
+                batch = [
+                    clean_csv_row(fields, row)
+                    for row in islice(rows, batch_size)
+                ]
+                if not batch:
+                    break
+                pickle.dump(batch, file)
+        except BaseException:
+            os.remove(file.name)
+            raise
+    return file.name
+
+
+def read_parsed_rows(path):
+    """Построчно читает значения полей из временного файла пакетов."""
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                yield from pickle.load(file)
+            except EOFError:
+                return
+
+
+def load_csv_stream(file_name, class_name, batch_size=BATCH_SIZE, rows=None):
+    """Потоково загружает csv-файл пакетами в одной транзакции.
+
+    Если переданы уже подготовленные значения полей `rows`,
+    файл повторно не читается.
+    """
+    table_name = class_name.__qualname__
+    if rows is None:
+        rows = (change_foreign_ids(row) for row in read_csv_rows(file_name))
+    objects = (class_name(**row) for row in rows)
+    loaded = 0
+    started = time.monotonic()
+    try:
+        with transaction.atomic():
+            while True:
+                batch = list(islice(objects, batch_size))
+                if not batch:
+                    break
+                class_name.objects.bulk_create(batch, batch_size=batch_size)
+                loaded += len(batch)
+    except (ValidationError, ValueError, IntegrityError) as error:
+        print_console(f'Ошибка в загружаемых данных. {error}. '
+                      f'Таблица {table_name} не загружена.')
+        return None
+    elapsed = time.monotonic() - started
+    rate = loaded / elapsed if elapsed else loaded
+    print_console(f'Таблица {table_name} загружена: {loaded} строк '
+                  f'за {elapsed:.2f} с ({rate:.0f} строк/с).')
+    return loaded
+
+
+def load_parsed_table(key, future, batch_size):
+    """Записывает в базу данных таблицу, подготовленную в пуле процессов.
+
+    Возвращает True, если таблица загружена.
+    """
+    class_name = FILES_CLASSES[key]
+    try:
+        path = future.result()
+    except (ValidationError, ValueError) as error:
+        print_console(f'Ошибка в загружаемых данных. {error}. '
+                      f'Таблица {class_name.__qualname__} не загружена.')
+        return False
+    try:
+        rows = read_parsed_rows(path)
+        return load_csv_stream(key, class_name, batch_size, rows) is not None
+    finally:
+        os.remove(path)
+
+
+def load_csv_parallel(workers, batch_size=BATCH_SIZE):
+    """Загружает csv-файлы в порядке зависимостей таблиц.
+
+    Файлы читаются и проверяются параллельно в пуле процессов,
+    запись в базу данных выполняется последовательно в порядке графа.
+    Таблицы отправляются в пул в том же порядке и не более чем на
+    `workers` таблиц вперед, а подготовленные пакеты хранятся
+    во временных файлах, которые удаляются сразу после записи таблицы.
+    """
+    dependencies = get_tables_dependencies()
+    order = iter(TopologicalSorter(dependencies).static_order())
+    not_loaded = set()
+    with TemporaryDirectory() as directory, ProcessPoolExecutor(
+            workers, initializer=setup_worker) as executor:
+        pending = deque()
+
+        def submit_next():
+            key = next(order, None)
+            if key is not None:
+                pending.append((key, executor.submit(
+                    parse_csv_file, key, FILES_CLASSES[key]._meta.label,
+                    batch_size, directory
+                )))
+
+        for _ in range(workers):
+            submit_next()
+        while pending:
+            key, future = pending.popleft()
+            submit_next()
+            table_name = FILES_CLASSES[key].__qualname__
+            print_console(f'Загрузка таблицы {table_name}')
+            if dependencies[key] & not_loaded:
+                print_console(f'Таблица {table_name} пропущена: '
+                              'не загружены связанные таблицы.')
+                not_loaded.add(key)
+            elif not load_parsed_table(key, future, batch_size):
+                not_loaded.add(key)
+    return not_loaded
+
+
+def get_chunk_checksum(chunk):
+    """Вычисляет контрольную сумму части csv-файла."""
+    checksum = hashlib.sha256()
+    for row in chunk:
+        checksum.update(repr(sorted(row.items())).encode())
+    return checksum.hexdigest()
+
+
+def upsert_chunk(class_name, fields, chunk):
+    """Добавляет новые и обновляет измененные строки части csv-файла.
+
+    Поля с auto_now и auto_now_add не сравниваются: при создании строки
+    их значение из csv-файла все равно заменяется текущим временем.
+    Возвращает количество записанных строк.
+    """
+    pk_name = class_name._meta.pk.attname
+    rows = [clean_csv_row(fields, row) for row in chunk]
+    existing = class_name.objects.in_bulk([row[pk_name] for row in rows])
+    compared = {
+        key for key, field in fields.items()
+        if not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+    }
+    created, changed, changed_fields = [], [], set()
+    for row in rows:
+        table = existing.get(row[pk_name])
+        if table is None:
+            created.append(class_name(**row))
+            continue
+        row_changed_fields = {
+            key for key, value in row.items()
+            if key in compared and getattr(table, key) != value
+        }
+        if row_changed_fields:
+            for key in row_changed_fields:
+                setattr(table, key, row[key])
+            changed.append(table)
+            changed_fields |= row_changed_fields
+    class_name.objects.bulk_create(created)
+    if changed:
+        class_name.objects.bulk_update(changed, changed_fields)
+    return len(created) + len(changed)
+
+
+def upsert_csv(file_name, class_name, batch_size=BATCH_SIZE):
+    """Инкрементально загружает csv-файл по частям.
+
+    Каждая часть записывается в отдельной транзакции вместе с ее
+    контрольной суммой, поэтому неизмененные и уже загруженные части
+    пропускаются, а прерванная загрузка продолжается с первой
+    незаписанной части.
+    """
+    table_name = class_name.__qualname__
+    fields = get_model_fields(class_name)
+    checksums = dict(
+        ImportState.objects.filter(
+            table=file_name
+        ).values_list('chunk', 'checksum')
+    )
+    rows = read_csv_rows(file_name)
+    chunks = iter(lambda: list(islice(rows, batch_size)), [])
+    written = skipped = 0
+    for number, chunk in enumerate(chunks):
+        checksum = get_chunk_checksum(chunk)
+        if checksums.get(number) == checksum:
+            skipped += len(chunk)
+            continue
+        try:
+            with transaction.atomic():
+                written += upsert_chunk(class_name, fields, chunk)
+                ImportState.objects.update_or_create(
+                    table=file_name,
+                    chunk=number,
+                    defaults={'checksum': checksum}
+                )
+        except (ValidationError, ValueError, IntegrityError) as error:
+            print_console(f'Ошибка в загружаемых данных. {error}. '
+                          f'Загрузка таблицы {table_name} остановлена '
+                          f'на части {number}.')
+            return None
+    print_console(f'Таблица {table_name} загружена: записано {written} '
+                  f'строк, пропущено без изменений {skipped}.')
+    return written
+
+
 class Command(BaseCommand):
     """Класс загрузки тестовой базы данных."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stream',
+            action='store_true',
+            help='Потоковая загрузка пакетами через bulk_create.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=positive_int,
+            default=BATCH_SIZE,
+            help='Размер пакета при потоковой и инкрементальной загрузке.'
+        )
+        parser.add_argument(
+            '--upsert',
+            action='store_true',
+            help=('Инкрементальная загрузка: записываются только новые '
+                  'и измененные строки, прерванная загрузка продолжается.')
+        )
+        parser.add_argument(
+            '--workers',
+            type=positive_int,
+            default=1,
+            help=('Число процессов для параллельного чтения csv-файлов '
+                  'при потоковой загрузке.')
+        )
+
     def handle(self, *args, **options):
-        for key, value in FILES_CLASSES.items():
-            print_console(f'Загрузка таблицы {value.__qualname__}')
-            load_csv(key, value)
+        if options['upsert']:
+            order = TopologicalSorter(get_tables_dependencies()).static_order()
+            for key in order:
+                value = FILES_CLASSES[key]
+                print_console(f'Загрузка таблицы {value.__qualname__}')
+                upsert_csv(key, value, options['batch_size'])
+        elif options['stream'] and options['workers'] > 1:
+            load_csv_parallel(options['workers'], options['batch_size'])
+        else:
+            for key, value in FILES_CLASSES.items():
+                print_console(f'Загрузка таблицы {value.__qualname__}')
+                if options['stream']:
+                    load_csv_stream(key, value, options['batch_size'])
+                else:
+                    load_csv(key, value)
+        if options['stream'] or options['upsert']:
+            recalculate_ratings()
+            print_console('Рейтинги произведений пересчитаны.')
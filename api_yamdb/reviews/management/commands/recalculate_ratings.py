@@ -0,0 +1,52 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import (
+    Avg,
+    Count,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Subquery,
+    Sum
+)
+from django.db.models.functions import Coalesce
+
+from reviews.models import Review, Title
+
+
+def recalculate_ratings():
+    """Пересчитывает рейтинги всех произведений одним запросом."""
+    reviews = Review.objects.filter(
+        title=OuterRef('pk')
+    ).order_by().values('title')
+    return Title.objects.update(
+        rating_sum=Coalesce(
+            Subquery(
+                reviews.annotate(total=Sum('score')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ),
+        rating_count=Coalesce(
+            Subquery(
+                reviews.annotate(total=Count('pk')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ),
+        rating=Subquery(
+            reviews.annotate(average=Avg('score')).values('average'),
+            output_field=FloatField()
+        )
+    )
+
+
+class Command(BaseCommand):
+    """Класс пересчета сохраненных рейтингов произведений."""
+
+    help = 'Пересчитывает рейтинги произведений по существующим отзывам.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = recalculate_ratings()
+        self.stdout.write(f'Пересчитан рейтинг произведений: {updated}.')
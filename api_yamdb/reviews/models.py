@@ -3,10 +3,12 @@ from django.core.validators import (
     MaxValueValidator,
     MinValueValidator
 )
-from django.db import models
+from django.db import models, transaction
 
 from api_yamdb.constants import (
     CATEGORY_GENRE_NAME_LENGTH,
+    IMPORT_CHECKSUM_LENGTH,
+    IMPORT_TABLE_NAME_LENGTH,
     LENGTH_TEXT,
     RATING_MAX,
     RATING_MIN,
@@ -55,6 +57,10 @@ class ReviewCommenBaseModel(models.Model):
         auto_now_add=True,
         db_index=True
     )
+    updated = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
 
     class Meta:
         ordering = ('-pub_date',)
@@ -113,11 +119,31 @@ class Title(models.Model):
         verbose_name='Категория',
         null=True
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        editable=False
+    )
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('-year', 'name')
+        indexes = (
+            models.Index(fields=['name', 'id'], name='title_name_id_idx'),
+            models.Index(fields=['year', 'id'], name='title_year_id_idx'),
+            models.Index(fields=['rating', 'id'], name='title_rating_id_idx'),
+        )
 
     def __str__(self):
         return self.name[:LENGTH_TEXT]
@@ -179,8 +205,32 @@ class Review(ReviewCommenBaseModel):
                 name='unique_author_title'
             ),
         )
+        indexes = (
+            models.Index(
+                fields=['title', '-pub_date', '-id'],
+                name='review_title_pub_date_idx'
+            ),
+        )
         default_related_name = 'reviews'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминает загруженные оценку и произведение
+        для пересчета рейтинга при изменении отзыва."""
+        instance = super().from_db(db, field_names, values)
+        if 'score' in instance.__dict__:
+            instance._loaded_score = instance.score
+        if 'title_id' in instance.__dict__:
+            instance._loaded_title_id = instance.title_id
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняет отзыв и пересчитывает рейтинг в одной транзакции."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_score = self.score
+        self._loaded_title_id = self.title_id
+
 
 class Comment(ReviewCommenBaseModel):
     """Класс комментариев."""
@@ -195,4 +245,44 @@ class Comment(ReviewCommenBaseModel):
     class Meta(ReviewCommenBaseModel.Meta):
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=['review', '-pub_date', '-id'],
+                name='comment_review_pub_date_idx'
+            ),
+        )
         default_related_name = 'comments'
+
+
+class ImportState(models.Model):
+    """Класс состояния загрузки частей csv-файлов."""
+
+    table = models.CharField(
+        'Таблица',
+        max_length=IMPORT_TABLE_NAME_LENGTH
+    )
+    chunk = models.PositiveIntegerField(
+        'Номер части'
+    )
+    checksum = models.CharField(
+        'Контрольная сумма',
+        max_length=IMPORT_CHECKSUM_LENGTH
+    )
+    loaded_at = models.DateTimeField(
+        'Дата загрузки',
+        auto_now=True
+    )
+
+    class Meta:
+        verbose_name = 'Состояние загрузки'
+        verbose_name_plural = 'Состояния загрузки'
+        ordering = ('table', 'chunk')
+        constraints = (
+            models.UniqueConstraint(
+                fields=['table', 'chunk'],
+                name='unique_import_table_chunk'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.table}: {self.chunk}'
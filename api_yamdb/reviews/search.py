@@ -0,0 +1,102 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.models import FloatField, Q
+from django.db.models.expressions import RawSQL
+
+from reviews.models import Title
+
+TITLE_FTS_TABLE = 'reviews_title_fts'
+
+TITLE_FTS_SQL = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {TITLE_FTS_TABLE} USING fts5('
+    'name, description, '
+    'content=\'reviews_title\', content_rowid=\'id\')',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_insert '
+    'AFTER INSERT ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_delete '
+    'AFTER DELETE ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    'VALUES (\'delete\', old.id, old.name, old.description); END',
+    'CREATE TRIGGER IF NOT EXISTS reviews_title_fts_update '
+    'AFTER UPDATE OF name, description ON reviews_title BEGIN '
+    f'INSERT INTO {TITLE_FTS_TABLE}'
+    f'({TITLE_FTS_TABLE}, rowid, name, description) '
+    'VALUES (\'delete\', old.id, old.name, old.description); '
+    f'INSERT INTO {TITLE_FTS_TABLE}(rowid, name, description) '
+    'VALUES (new.id, new.name, new.description); END',
+    f'INSERT INTO {TITLE_FTS_TABLE}({TITLE_FTS_TABLE}) VALUES (\'rebuild\')',
+)
+
+_fts_available = {}
+
+
+def create_title_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """Создает полнотекстовый индекс FTS5 по названиям и описаниям
+    произведений и триггеры, поддерживающие его актуальность.
+
+    Выполняется после миграций; на других СУБД и в сборках SQLite
+    без FTS5 ничего не делает.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    try:
+        with connection.cursor() as cursor:
+            for sql in TITLE_FTS_SQL:
+                cursor.execute(sql)
+    except OperationalError:
+        return
+    _fts_available[(using, connection.settings_dict['NAME'])] = True
+
+
+def is_title_search_index_available(using=DEFAULT_DB_ALIAS):
+    """Проверяет, есть ли в базе данных полнотекстовый индекс."""
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return False
+    key = (using, connection.settings_dict['NAME'])
+    if key not in _fts_available:
+        _fts_available[key] = (
+            TITLE_FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[key]
+
+
+def get_fts_query(query):
+    """Преобразует строку поиска в запрос FTS5 из префиксов слов."""
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', query))
+
+
+def search_titles(queryset, query):
+    """Отбирает произведения по строке поиска.
+
+    При наличии индекса FTS5 результаты упорядочены по релевантности
+    (аннотация `search_rank`), иначе используется поиск подстроки.
+    """
+    fts_query = get_fts_query(query)
+    if not fts_query:
+        return queryset.none()
+    if not is_title_search_index_available(queryset.db):
+        return queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+    table = Title._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(
+            f'SELECT rowid FROM {TITLE_FTS_TABLE} '
+            f'WHERE {TITLE_FTS_TABLE} MATCH %s',
+            (fts_query,)
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f'SELECT bm25({TITLE_FTS_TABLE}) FROM {TITLE_FTS_TABLE} '
+            f'WHERE {TITLE_FTS_TABLE} MATCH %s '
+            f'AND {TITLE_FTS_TABLE}.rowid = "{table}"."id"',
+            (fts_query,),
+            output_field=FloatField()
+        )
+    )
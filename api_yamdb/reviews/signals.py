@@ -0,0 +1,56 @@
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Review, Title
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Изменяет сохраненные сумму и количество оценок
+    и средний рейтинг произведения одним запросом."""
+    if title_id is None:
+        return
+    rating_sum = F('rating_sum') + score_delta
+    rating_count = F('rating_count') + count_delta
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        rating=Case(
+            When(
+                rating_count__gt=-count_delta,
+                then=Cast(rating_sum, FloatField()) / rating_count
+            ),
+            default=None,
+            output_field=FloatField()
+        )
+    )
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, raw=False, **kwargs):
+    """Учитывает оценку нового или измененного отзыва в рейтинге."""
+    if raw:
+        return
+    if created:
+        change_title_rating(instance.title_id, instance.score, 1)
+        return
+    loaded_title_id = getattr(instance, '_loaded_title_id', instance.title_id)
+    loaded_score = getattr(instance, '_loaded_score', instance.score)
+    if loaded_title_id != instance.title_id:
+        change_title_rating(loaded_title_id, -loaded_score, -1)
+        change_title_rating(instance.title_id, instance.score, 1)
+    elif loaded_score != instance.score:
+        change_title_rating(
+            instance.title_id, instance.score - loaded_score, 0
+        )
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    """Исключает оценку удаленного отзыва из рейтинга."""
+    change_title_rating(
+        getattr(instance, '_loaded_title_id', instance.title_id),
+        -getattr(instance, '_loaded_score', instance.score),
+        -1
+    )
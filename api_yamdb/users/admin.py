@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
+from api_yamdb.admin_tools import ApproximateCountPaginator, UsernameFilter
 from api_yamdb.constants import MAX_SEARCH_RESULTS
 from users.models import User
 
@@ -20,9 +21,11 @@ class UserAdmin(BaseUserAdmin):
     )
     empty_value_display = 'значение отсутствует'
     list_editable = ('role',)
-    list_filter = ('username',)
+    list_filter = (UsernameFilter, 'role')
     list_per_page = MAX_SEARCH_RESULTS
+    paginator = ApproximateCountPaginator
     search_fields = ('username', 'role')
+    show_full_result_count = False
     fieldsets = BaseUserAdmin.fieldsets + (
         ('Extra Fields', {'fields': ('bio', 'role',)}),
     )
@@ -0,0 +1,158 @@
+import time
+from contextlib import suppress
+from datetime import timedelta
+
+from django.core.mail import EmailMessage, get_connection
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api_yamdb.constants import (
+    EMAIL_OUTBOX_BATCH_SIZE,
+    EMAIL_OUTBOX_MAX_ATTEMPTS,
+    EMAIL_OUTBOX_RETRY_DELAY
+)
+from users.models import EmailOutbox
+
+OUTBOX_POLL_INTERVAL = 5
+
+
+def get_retry_delay(attempts, retry_delay):
+    """Вычисляет паузу перед следующей попыткой отправки письма.
+
+    Пауза удваивается с каждой неудачной попыткой.
+    """
+    return timedelta(seconds=retry_delay * 2 ** (attempts - 1))
+
+
+def claim_outbox_batch(batch_size, max_attempts, retry_delay):
+    """Забирает пачку писем к отправке в короткой транзакции.
+
+    Попытка засчитывается сразу, а следующая откладывается как после
+    неудачи: другие процессы не возьмут письма, пока они отправляются,
+    а если процесс завершится во время отправки, письма будут
+    отправлены повторно после паузы.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True).filter(
+                sent__isnull=True,
+                attempts__lt=max_attempts,
+                next_attempt_at__lte=now
+            ).order_by('pk')[:batch_size]
+        )
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = now + get_retry_delay(
+                email.attempts, retry_delay
+            )
+        EmailOutbox.objects.bulk_update(
+            emails, ('attempts', 'next_attempt_at')
+        )
+    return emails
+
+
+def send_emails(connection, emails):
+    """Отправляет письма через соединение и отмечает результат в них.
+
+    Возвращает количество отправленных писем.
+    """
+    sent = 0
+    for email in emails:
+        message = EmailMessage(
+            email.subject,
+            email.message,
+            email.from_email,
+            [email.recipient],
+            connection=connection
+        )
+        try:
+            connection.open()
+            connection.send_messages([message])
+        except Exception as error:
+            email.last_error = str(error)
+            # Сервер мог разорвать соединение: следующее письмо
+            # отправляется через новое.
+            with suppress(Exception):
+                connection.close()
+        else:
+            email.sent = timezone.now()
+            sent += 1
+    return sent
+
+
+def send_outbox_batch(batch_size, max_attempts,
+                      retry_delay=EMAIL_OUTBOX_RETRY_DELAY):
+    """Отправляет пачку писем из очереди через одно соединение.
+
+    Письма отправляются вне транзакции, чтобы не удерживать блокировку
+    базы данных во время обмена с почтовым сервером. Неотправленные
+    письма остаются в очереди до исчерпания попыток, следующая попытка
+    откладывается на `retry_delay` секунд, удваивающихся с каждой
+    неудачей.
+    Возвращает количество отправленных писем.
+    """
+    emails = claim_outbox_batch(batch_size, max_attempts, retry_delay)
+    if not emails:
+        return 0
+    connection = get_connection()
+    try:
+        sent = send_emails(connection, emails)
+    finally:
+        with suppress(Exception):
+            connection.close()
+    EmailOutbox.objects.bulk_update(emails, ('sent', 'last_error'))
+    return sent
+
+
+class Command(BaseCommand):
+    """Класс отправки писем из очереди исходящих писем."""
+
+    help = 'Отправляет письма из очереди пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=EMAIL_OUTBOX_BATCH_SIZE,
+            help='Количество писем, отправляемых за один проход.'
+        )
+        parser.add_argument(
+            '--max-attempts',
+            type=int,
+            default=EMAIL_OUTBOX_MAX_ATTEMPTS,
+            help='Количество попыток отправки одного письма.'
+        )
+        parser.add_argument(
+            '--retry-delay',
+            type=float,
+            default=EMAIL_OUTBOX_RETRY_DELAY,
+            help=('Пауза в секундах перед повторной отправкой письма, '
+                  'удваивается с каждой неудачной попыткой.')
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=OUTBOX_POLL_INTERVAL,
+            help='Пауза в секундах, если писем к отправке нет.'
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Отправить накопившиеся письма и завершить работу.'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_outbox_batch(
+                options['batch_size'],
+                options['max_attempts'],
+                options['retry_delay']
+            )
+            if sent:
+                self.stdout.write(f'Отправлено писем: {sent}.')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
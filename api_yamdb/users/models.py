@@ -1,8 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import RegexValidator
 from django.db import models
+from django.utils import timezone
 
 from api_yamdb.constants import (
+    EMAIL_SUBJECT_MAX_LENGTH,
     LENGTH_TEXT,
     USERNAME_MAX_LENGTH,
     EMAIL_MAX_LENGTH
@@ -62,3 +64,54 @@ class User(AbstractUser):
     @property
     def is_moderator(self):
         return self.role == UserRoles.moderator.name
+
+
+class EmailOutbox(models.Model):
+    """Класс исходящих писем, ожидающих отправки."""
+
+    subject = models.CharField(
+        'Тема',
+        max_length=EMAIL_SUBJECT_MAX_LENGTH
+    )
+    message = models.TextField(
+        'Текст'
+    )
+    from_email = models.EmailField(
+        'Отправитель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    recipient = models.EmailField(
+        'Получатель',
+        max_length=EMAIL_MAX_LENGTH
+    )
+    created = models.DateTimeField(
+        'Дата создания',
+        auto_now_add=True
+    )
+    sent = models.DateTimeField(
+        'Дата отправки',
+        null=True,
+        blank=True,
+        db_index=True
+    )
+    attempts = models.PositiveSmallIntegerField(
+        'Попытки отправки',
+        default=0
+    )
+    last_error = models.TextField(
+        'Последняя ошибка',
+        blank=True
+    )
+    next_attempt_at = models.DateTimeField(
+        'Дата следующей попытки',
+        default=timezone.now,
+        db_index=True
+    )
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        ordering = ('created',)
+
+    def __str__(self):
+        return f'{self.recipient}: {self.subject[:LENGTH_TEXT]}'
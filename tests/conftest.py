@@ -1,6 +1,8 @@
 import os
 import sys
+from contextlib import contextmanager
 
+import pytest
 from django.utils.version import get_version
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -33,3 +35,48 @@ assert get_version() < '4.0.0', 'Пожалуйста, используйте в
 pytest_plugins = [
     'tests.fixtures.fixture_user',
 ]
+
+
+@pytest.fixture(autouse=True)
+def send_emails_immediately(settings):
+    settings.EMAIL_OUTBOX_ASYNC = False
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    from api.v1.authentication import user_cache
+    from api.v1.facets import title_facet_index
+    from api.v1.suggest import title_index
+
+    user_cache.clear()
+    title_index.reset()
+    title_facet_index.invalidate()
+    yield
+    user_cache.clear()
+    title_index.reset()
+    title_facet_index.invalidate()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    from django.core.cache import cache
+
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def assert_no_nplusone():
+    from api_yamdb.nplusone import NPlusOneDetector
+
+    @contextmanager
+    def check(threshold=None):
+        detector = NPlusOneDetector(threshold)
+        with detector.capture():
+            yield detector
+        report = detector.report()
+        if report:
+            pytest.fail(f'Обнаружены запросы N+1:\n{report}', pytrace=False)
+
+    return check
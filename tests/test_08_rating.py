@@ -0,0 +1,76 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        reviews, titles = create_reviews(admin_client, author_map)
+        title_id = titles[0]['id']
+        assert self.get_rating(admin_client, title_id) == 5, (
+            'Проверьте, что рейтинг произведения учитывает новые отзывы.'
+        )
+
+        response = user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[1]['id']
+            ),
+            data={'score': 9}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert self.get_rating(admin_client, title_id) == 7, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при изменении оценки отзыва.'
+        )
+
+        response = admin_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=reviews[0]['id']
+            )
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert self.get_rating(admin_client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'при удалении отзыва.'
+        )
+
+        user.delete()
+        assert self.get_rating(admin_client, title_id) is None, (
+            'Проверьте, что рейтинг произведения без отзывов равен `None`.'
+        )
+
+    def test_02_recalculate_ratings_command(self, admin_client, admin,
+                                            user_client, user):
+        from reviews.models import Title
+
+        author_map = {admin: admin_client, user: user_client}
+        _, titles = create_reviews(admin_client, author_map)
+        Title.objects.update(rating_sum=0, rating_count=0)
+
+        call_command('recalculate_ratings')
+
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.rating_sum, title.rating_count) == (10, 2), (
+            'Проверьте, что команда `recalculate_ratings` восстанавливает '
+            'сохраненный рейтинг по существующим отзывам.'
+        )
+        assert self.get_rating(admin_client, titles[1]['id']) is None
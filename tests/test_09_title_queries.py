@@ -0,0 +1,400 @@
+import pytest
+
+from tests.utils import create_titles
+
+TITLE_LIST_QUERY_BUDGET = 3
+TITLE_DETAIL_QUERY_BUDGET = 2
+TITLE_FACETS_QUERY_BUDGET = 4
+
+
+def create_more_titles(count):
+    from reviews.models import Category, Genre, Title
+
+    category = Category.objects.first()
+    genres = list(Genre.objects.all())
+    for number in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {number}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    @pytest.mark.parametrize('extra_titles', (0, 10))
+    def test_01_title_list_query_budget(self, client, admin_client,
+                                        django_assert_max_num_queries,
+                                        extra_titles):
+        create_titles(admin_client)
+        create_more_titles(extra_titles)
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get(self.TITLES_URL)
+        assert response.json()['results'][0]['genre'], (
+            f'Проверьте, что ответ на GET-запрос к `{self.TITLES_URL}` '
+            'содержит жанры произведений.'
+        )
+
+    def test_02_title_detail_query_budget(self, client, admin_client,
+                                          django_assert_max_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        with django_assert_max_num_queries(TITLE_DETAIL_QUERY_BUDGET):
+            response = client.get(
+                self.TITLE_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[0]['id']
+                )
+            )
+        assert response.json()['category'], (
+            'Проверьте, что ответ на GET-запрос к '
+            f'`{self.TITLE_DETAIL_URL_TEMPLATE}` содержит категорию.'
+        )
+
+    @pytest.mark.parametrize('ordering', ('name', '-year', 'rating', '-rating'))
+    def test_03_title_keyset_pagination(self, client, admin_client,
+                                        ordering):
+        from reviews.models import Title
+
+        create_titles(admin_client)
+        create_more_titles(10)
+        for number, title in enumerate(Title.objects.order_by('pk')):
+            title.year = 2000 + number % 3
+            title.rating = None if number % 4 == 0 else number % 5
+            title.save()
+        field = ordering.lstrip('-')
+        expected = sorted(
+            Title.objects.values_list('id', field),
+            key=lambda row: (row[1] is not None, row[1], row[0]),
+            reverse=ordering.startswith('-')
+        )
+        expected = [title_id for title_id, _ in expected]
+
+        data = client.get(
+            self.TITLES_URL, {'pagination': 'cursor', 'ordering': ordering}
+        ).json()
+        assert 'count' not in data, (
+            f'Проверьте, что пагинация по ключу для `{self.TITLES_URL}` '
+            'не подсчитывает общее количество произведений.'
+        )
+        pages = [[title['id'] for title in data['results']]]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append([title['id'] for title in data['results']])
+        assert sum(pages, []) == expected, (
+            f'Проверьте, что пагинация по ключу для `{self.TITLES_URL}` '
+            f'с сортировкой `{ordering}` возвращает каждое произведение '
+            'ровно один раз в правильном порядке.'
+        )
+        for page in reversed(pages[:-1]):
+            data = client.get(data['previous']).json()
+            assert [title['id'] for title in data['results']] == page, (
+                'Проверьте, что ссылка `previous` при пагинации по ключу '
+                'возвращает предыдущую страницу.'
+            )
+        assert data['previous'] is None
+
+    @pytest.mark.parametrize('field, value', (
+        ('name', 'М'), ('year', 1990), ('rating', 5), ('rating', None)
+    ))
+    @pytest.mark.parametrize('descending', (False, True))
+    def test_03_title_keyset_filters_use_index(self, field, value,
+                                               descending):
+        from api.v1.pagination import (get_keyset_filters,
+                                       get_keyset_ordering)
+        from reviews.models import Title
+
+        for keyset_filter in get_keyset_filters(
+                field, value, 10, descending,
+                Title._meta.get_field(field).null):
+            plan = Title.objects.order_by(
+                *get_keyset_ordering(field, descending)
+            ).filter(keyset_filter)[:11].explain()
+            assert 'SEARCH reviews_title USING INDEX' in plan, (
+                'Проверьте, что пагинация по ключу находит начало страницы '
+                f'по индексу, а не просматривает таблицу: {plan}'
+            )
+            assert 'TEMP B-TREE' not in plan
+
+    def test_04_title_full_text_search(self, client, admin_client):
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.filter(pk=titles[1]['id']).update(
+            description='Полицейский Джон спасает заложников'
+        )
+        response = client.get(self.TITLES_URL, {'search': 'заложник'})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что параметр `search` для `{self.TITLES_URL}` '
+            'ищет произведения по описанию.'
+        )
+        response = client.get(self.TITLES_URL, {'search': 'терминатор'})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что параметр `search` для `{self.TITLES_URL}` '
+            'ищет произведения по названию без учета регистра.'
+        )
+
+    def test_05_title_suggest(self, client, admin_client,
+                              django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        url = f'{self.TITLES_URL}suggest/'
+        response = client.get(url, {'q': 'кре'})
+        assert response.json() == [
+            {'id': titles[1]['id'], 'name': titles[1]['name']}
+        ], (
+            f'Проверьте, что `{url}` подсказывает произведения по началу '
+            'названия без учета регистра.'
+        )
+        response = admin_client.post(self.TITLES_URL, data={
+            'name': 'Крестный отец',
+            'year': 1972,
+            'genre': [titles[1]['genre'][0]],
+            'category': titles[1]['category']
+        })
+        with django_assert_num_queries(0):
+            response = client.get(url, {'q': 'Крес'})
+        assert [title['name'] for title in response.json()] == [
+            'Крестный отец'
+        ], (
+            f'Проверьте, что `{url}` учитывает новые произведения '
+            'без запросов к базе данных.'
+        )
+
+    def test_05_title_suggest_rebuild_does_not_block(self, admin_client,
+                                                     monkeypatch):
+        from threading import Event, Thread
+
+        from api.v1.suggest import TitlePrefixIndex, title_index
+
+        titles, _, _ = create_titles(admin_client)
+        assert title_index.suggest('кре', 10)
+        build = TitlePrefixIndex._build
+        started, finish = Event(), Event()
+
+        def slow_build():
+            started.set()
+            finish.wait(5)
+            return build()
+
+        monkeypatch.setattr(title_index, '_build', slow_build)
+        monkeypatch.setattr(title_index, 'ttl', -1)
+        rebuild = Thread(target=title_index.suggest, args=('кре', 10))
+        rebuild.start()
+        try:
+            assert started.wait(5)
+            title_index.update(titles[1]['id'], 'Крепость')
+            assert [
+                title['name'] for title in title_index.suggest('кре', 10)
+            ] == ['Крепость'], (
+                'Проверьте, что подсказки во время перестройки индекса '
+                'отдаются по прежнему состоянию без ожидания.'
+            )
+        finally:
+            finish.set()
+            rebuild.join(5)
+        monkeypatch.setattr(title_index, 'ttl', 3600)
+        assert [
+            title['name'] for title in title_index.suggest('кре', 10)
+        ] == ['Крепость'], (
+            'Проверьте, что изменения, пришедшие во время перестройки '
+            'индекса подсказок, не теряются.'
+        )
+
+    def test_06_title_genre_filter_distinct(self, client, admin_client,
+                                            django_assert_max_num_queries):
+        from reviews.models import Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        Genre.objects.create(name='Мелодрама', slug='melodrama')
+        title = Title.objects.get(pk=titles[1]['id'])
+        title.genre.add(Genre.objects.get(slug='melodrama'))
+
+        with django_assert_max_num_queries(TITLE_LIST_QUERY_BUDGET):
+            response = client.get(self.TITLES_URL, {'genre': 'drama'})
+        data = response.json()
+        assert data['count'] == 1 and len(data['results']) == 1, (
+            f'Проверьте, что фильтр по жанру для `{self.TITLES_URL}` '
+            'не возвращает одно произведение несколько раз.'
+        )
+
+    @pytest.mark.parametrize('params', (
+        {},
+        {'genre': 'comedy,drama'},
+        {'genre': 'horror,comedy', 'genre_match': 'all'},
+        {'genre': 'o', 'category': 'films'},
+        {'year': 2000, 'page': 2},
+        {'category': 'books', 'year': 1984},
+    ))
+    def test_07_title_facet_index(self, client, admin_client, settings,
+                                  params):
+        create_titles(admin_client)
+        create_more_titles(6)
+
+        database = client.get(self.TITLES_URL, params).json()
+        settings.TITLE_FACET_INDEX = True
+        response = client.get(self.TITLES_URL, params)
+        assert response.json() == database, (
+            f'Проверьте, что индекс фильтров для `{self.TITLES_URL}` '
+            f'возвращает те же данные, что и база данных, для {params}.'
+        )
+
+    @pytest.mark.parametrize('facet_index', (False, True))
+    def test_08_title_facets(self, client, admin_client, settings,
+                             django_assert_max_num_queries, facet_index):
+        settings.TITLE_FACET_INDEX = facet_index
+        create_titles(admin_client)
+        url = f'{self.TITLES_URL}facets/'
+
+        with django_assert_max_num_queries(TITLE_FACETS_QUERY_BUDGET):
+            response = client.get(url, {'genre': 'horror,drama'})
+        assert response.json() == {
+            'count': 2,
+            'genre': [
+                {'slug': 'comedy', 'count': 1},
+                {'slug': 'drama', 'count': 1},
+                {'slug': 'horror', 'count': 1}
+            ],
+            'category': [
+                {'slug': 'books', 'count': 1},
+                {'slug': 'films', 'count': 1}
+            ],
+            'year': [{'year_from': 1980, 'year_to': 1989, 'count': 2}]
+        }, (
+            f'Проверьте, что `{url}` считает произведения, подходящие '
+            'под фильтры, по жанрам, категориям и интервалам лет.'
+        )
+        response = client.get(url, {'category': 'films'})
+        assert response.json()['count'] == 1
+
+        create_more_titles(1)
+        response = client.get(url, {'genre': 'horror,drama'})
+        assert response.json()['count'] == 3, (
+            f'Проверьте, что кэш ответа `{url}` сбрасывается '
+            'при добавлении произведений.'
+        )
+
+    @pytest.fixture
+    def facet_index_builds(self, monkeypatch):
+        from api.v1.facets import FacetSnapshot
+
+        builds = []
+        build = FacetSnapshot.build.__func__
+
+        def counted_build(cls):
+            builds.append(1)
+            return build(cls)
+
+        monkeypatch.setattr(FacetSnapshot, 'build', classmethod(counted_build))
+        return builds
+
+    def assert_index_matches_database(self, client, settings, params):
+        settings.TITLE_FACET_INDEX = False
+        database = client.get(self.TITLES_URL, params).json()
+        settings.TITLE_FACET_INDEX = True
+        response = client.get(self.TITLES_URL, params)
+        assert response.json() == database, (
+            f'Проверьте, что индекс фильтров для `{self.TITLES_URL}` '
+            f'возвращает те же данные, что и база данных, для {params}.'
+        )
+
+    def test_09_title_facet_index_incremental_updates(
+            self, client, admin_client, settings, facet_index_builds):
+        from reviews.models import Category, Genre
+
+        titles, _, _ = create_titles(admin_client)
+        create_more_titles(3)
+        settings.TITLE_FACET_INDEX = True
+        client.get(self.TITLES_URL)
+        assert len(facet_index_builds) == 1
+
+        admin_client.post(self.TITLES_URL, data={
+            'name': 'Алиса', 'year': 1865, 'genre': ['drama'],
+            'category': 'books'
+        })
+        admin_client.patch(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id']),
+            data={'name': 'Я', 'year': 1991, 'genre': ['drama'],
+                  'category': 'books'}
+        )
+        admin_client.delete(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=titles[1]['id'])
+        )
+        category = Category.objects.get(slug='films')
+        category.slug = 'movies'
+        category.save()
+        Genre.objects.get(slug='horror').delete()
+
+        for params in (
+                {},
+                {'genre': 'drama'},
+                {'genre': 'comedy,horror'},
+                {'category': 'books'},
+                {'category': 'movies'},
+                {'year': 1991},
+                {'year': 1988},
+        ):
+            self.assert_index_matches_database(client, settings, params)
+        assert len(facet_index_builds) == 1, (
+            'Проверьте, что изменения произведений, жанров и категорий '
+            'применяются к индексу фильтров без его перестройки.'
+        )
+
+    def test_10_title_facet_index_detects_external_changes(
+            self, client, admin_client, settings, facet_index_builds):
+        from api.v1.cache import bump_model_version
+        from api.v1.facets import title_facet_index
+        from reviews.models import Title
+
+        titles, _, _ = create_titles(admin_client)
+        settings.TITLE_FACET_INDEX = True
+        client.get(self.TITLES_URL)
+
+        Title.objects.filter(pk=titles[0]['id']).update(year=1900)
+        bump_model_version(Title)
+        self.assert_index_matches_database(client, settings, {'year': 1900})
+        assert len(facet_index_builds) == 2, (
+            'Проверьте, что индекс фильтров перестраивается, если версия '
+            'данных изменена другим процессом.'
+        )
+
+        Title.objects.filter(pk=titles[1]['id']).update(year=1900)
+        title_facet_index.ttl = 0
+        try:
+            self.assert_index_matches_database(
+                client, settings, {'year': 1900}
+            )
+        finally:
+            title_facet_index.ttl = type(title_facet_index)().ttl
+        assert len(facet_index_builds) == 3, (
+            'Проверьте, что индекс фильтров перестраивается по истечении '
+            'времени жизни.'
+        )
+
+    def test_11_title_facet_index_keeps_external_changes(
+            self, client, admin_client, settings, facet_index_builds):
+        from api.v1.cache import bump_model_version
+        from reviews.models import Genre, Title
+
+        titles, _, _ = create_titles(admin_client)
+        settings.TITLE_FACET_INDEX = True
+        client.get(self.TITLES_URL)
+
+        Title.objects.filter(pk=titles[1]['id']).update(year=1900)
+        bump_model_version(Title)
+        Genre.objects.create(name='Мюзикл', slug='musical')
+        self.assert_index_matches_database(client, settings, {'year': 1900})
+        assert len(facet_index_builds) == 2, (
+            'Проверьте, что изменение этого процесса не скрывает от '
+            'индекса фильтров изменения, сделанные другим процессом.'
+        )
+
+        Genre.objects.create(name='Вестерн', slug='western')
+        self.assert_index_matches_database(
+            client, settings, {'genre': 'western'}
+        )
+        assert len(facet_index_builds) == 2
@@ -0,0 +1,84 @@
+import pytest
+
+from tests.utils import create_comments, create_reviews
+
+# Родительский объект, COUNT и страница; ETag вычисляется без запросов.
+REVIEW_LIST_QUERY_BUDGET = 3
+COMMENT_LIST_QUERY_BUDGET = 3
+# Родительский объект и страница.
+CURSOR_LIST_QUERY_BUDGET = 2
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10ReviewCommentQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_review_and_comment_list_query_budget(
+            self, client, admin_client, admin, user_client, user,
+            moderator_client, moderator, django_assert_max_num_queries):
+        author_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+        _, reviews, titles = create_comments(admin_client, author_map)
+
+        with django_assert_max_num_queries(REVIEW_LIST_QUERY_BUDGET):
+            response = client.get(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+            )
+        authors = {review['author'] for review in response.json()['results']}
+        assert authors == {user.username for user in author_map}, (
+            'Проверьте, что ответ на GET-запрос к '
+            f'`{self.REVIEWS_URL_TEMPLATE}` содержит авторов отзывов.'
+        )
+
+        with django_assert_max_num_queries(COMMENT_LIST_QUERY_BUDGET):
+            response = client.get(
+                self.COMMENTS_URL_TEMPLATE.format(
+                    title_id=titles[0]['id'], review_id=reviews[0]['id']
+                )
+            )
+        authors = {
+            comment['author'] for comment in response.json()['results']
+        }
+        assert authors == {user.username for user in author_map}, (
+            'Проверьте, что ответ на GET-запрос к '
+            f'`{self.COMMENTS_URL_TEMPLATE}` содержит авторов комментариев.'
+        )
+
+    def test_02_review_cursor_pagination(self, client, admin_client, admin,
+                                         django_user_model,
+                                         django_assert_max_num_queries):
+        from reviews.models import Review
+
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        for number in range(6):
+            author = django_user_model.objects.create_user(
+                username=f'reviewer{number}',
+                email=f'reviewer{number}@yamdb.fake'
+            )
+            reviews.append({'id': Review.objects.create(
+                title_id=titles[0]['id'], author=author, text='Отзыв', score=7
+            ).id})
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        with django_assert_max_num_queries(CURSOR_LIST_QUERY_BUDGET):
+            response = client.get(url, {'pagination': 'cursor'})
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            f'Проверьте, что GET-запрос к `{url}?pagination=cursor` '
+            'возвращает курсорную пагинацию без ключа `count`.'
+        )
+        received = [review['id'] for review in data['results']]
+        while data['next']:
+            data = client.get(data['next']).json()
+            received.extend(review['id'] for review in data['results'])
+        assert sorted(received) == sorted(review['id'] for review in reviews), (
+            'Проверьте, что курсорная пагинация отзывов возвращает '
+            'каждый отзыв ровно один раз.'
+        )
@@ -0,0 +1,50 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_reviews, create_titles
+
+
+def count_selects(queries, table):
+    return sum(
+        query['sql'].startswith('SELECT')
+        and f'FROM "{table}"' in query['sql']
+        for query in queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ParentObjects:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def test_01_review_post_loads_title_once(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            admin_client.post(
+                self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id']),
+                data={'text': 'Отзыв', 'score': 5}
+            )
+        assert count_selects(context.captured_queries, 'reviews_title') == 1, (
+            f'Проверьте, что при POST-запросе к `{self.REVIEWS_URL_TEMPLATE}` '
+            'произведение загружается из базы данных один раз.'
+        )
+
+    def test_02_comment_patch_loads_review_once(self, admin_client, admin):
+        reviews, titles = create_reviews(admin_client, {admin: admin_client})
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        comment_id = admin_client.post(url, data={'text': 'Текст'}).json()['id']
+        with CaptureQueriesContext(connection) as context:
+            admin_client.patch(f'{url}{comment_id}/', data={'text': 'Новый'})
+        assert count_selects(
+            context.captured_queries, 'reviews_review'
+        ) == 1, (
+            'Проверьте, что при PATCH-запросе к '
+            f'`{self.COMMENTS_URL_TEMPLATE}<comment_id>/` отзыв загружается '
+            'из базы данных один раз.'
+        )
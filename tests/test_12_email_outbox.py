@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.db import connection
+
+
+class DroppingEmailBackend(EmailBackend):
+    """Почтовый сервер, разрывающий соединение после первого письма."""
+
+    opened = 0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.connected = False
+        self.dropped = False
+
+    def open(self):
+        if self.connected:
+            return False
+        DroppingEmailBackend.opened += 1
+        self.connected = True
+        return True
+
+    def close(self):
+        self.connected = False
+
+    def send_messages(self, messages):
+        assert not connection.in_atomic_block, (
+            'Проверьте, что письма отправляются вне транзакции базы данных.'
+        )
+        if not self.connected or self.dropped:
+            self.dropped = False
+            raise ConnectionError('Соединение разорвано сервером')
+        self.dropped = True
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12EmailOutbox:
+
+    SIGNUP_URL = '/api/v1/auth/signup/'
+
+    def test_01_signup_queues_email(self, client, settings):
+        from users.models import EmailOutbox
+
+        settings.EMAIL_OUTBOX_ASYNC = True
+        data = {'email': 'outbox@yamdb.fake', 'username': 'outbox'}
+        response = client.post(self.SIGNUP_URL, data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert not mail.outbox, (
+            'Проверьте, что при включенной очереди писем запрос к '
+            f'`{self.SIGNUP_URL}` не отправляет письмо сразу.'
+        )
+        assert EmailOutbox.objects.filter(
+            recipient=data['email'], sent__isnull=True
+        ).exists(), (
+            f'Проверьте, что запрос к `{self.SIGNUP_URL}` добавляет письмо '
+            'с кодом подтверждения в очередь исходящих писем.'
+        )
+
+        call_command('send_outbox_emails', '--once')
+
+        assert len(mail.outbox) == 1 and data['email'] in mail.outbox[0].to, (
+            'Проверьте, что команда `send_outbox_emails` отправляет письма '
+            'из очереди.'
+        )
+        assert not EmailOutbox.objects.filter(sent__isnull=True).exists(), (
+            'Проверьте, что отправленные письма отмечаются в очереди.'
+        )
+
+    def test_02_failed_email_is_retried_with_backoff(self, monkeypatch):
+        from datetime import timedelta
+
+        from django.utils import timezone
+        from users.models import EmailOutbox
+
+        def fail(backend, messages):
+            raise ConnectionError('SMTP недоступен')
+
+        email = EmailOutbox.objects.create(
+            subject='Код', message='123', from_email='from@yamdb.fake',
+            recipient='retry@yamdb.fake'
+        )
+        monkeypatch.setattr(EmailBackend, 'send_messages', fail)
+        started = timezone.now()
+        call_command('send_outbox_emails', '--once', '--retry-delay', '60')
+
+        email.refresh_from_db()
+        assert email.attempts == 1, (
+            'Проверьте, что после неудачной отправки письмо не '
+            'отправляется повторно сразу же.'
+        )
+        assert email.sent is None and 'SMTP' in email.last_error
+        assert email.next_attempt_at >= started + timedelta(seconds=60), (
+            'Проверьте, что следующая попытка отправки откладывается.'
+        )
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        started = timezone.now()
+        call_command('send_outbox_emails', '--once', '--retry-delay', '60')
+        email.refresh_from_db()
+        assert email.attempts == 2
+        assert email.next_attempt_at >= started + timedelta(seconds=120), (
+            'Проверьте, что пауза перед повторной отправкой растет с '
+            'каждой неудачной попыткой.'
+        )
+
+        monkeypatch.undo()
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        call_command('send_outbox_emails', '--once')
+        email.refresh_from_db()
+        assert email.sent is not None and email.attempts == 3, (
+            'Проверьте, что письмо отправляется при следующей попытке.'
+        )
+        assert len(mail.outbox) == 1
+
+    def test_03_dropped_connection_is_reopened(self, settings):
+        from users.models import EmailOutbox
+
+        settings.EMAIL_BACKEND = (
+            'tests.test_12_email_outbox.DroppingEmailBackend'
+        )
+        DroppingEmailBackend.opened = 0
+        emails = [
+            EmailOutbox.objects.create(
+                subject='Код', message='123', from_email='from@yamdb.fake',
+                recipient=f'drop{number}@yamdb.fake'
+            )
+            for number in range(3)
+        ]
+        call_command('send_outbox_emails', '--once')
+
+        for email in emails:
+            email.refresh_from_db()
+        assert [email.sent is not None for email in emails] == [
+            True, False, True
+        ], (
+            'Проверьте, что после разрыва соединения следующие письма '
+            'отправляются через новое соединение.'
+        )
+        assert DroppingEmailBackend.opened == 2
+        assert emails[1].attempts == 1 and emails[1].last_error
+        assert len(mail.outbox) == 2
@@ -0,0 +1,43 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+def count_user_selects(queries):
+    return sum('FROM "users_user"' in query['sql'] for query in queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13AuthenticationCache:
+
+    USERS_URL = '/api/v1/users/'
+    CATEGORIES_URL = '/api/v1/categories/'
+
+    def test_01_user_loaded_once(self, user_client):
+        user_client.get(self.CATEGORIES_URL)
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(self.CATEGORIES_URL)
+        assert response.status_code == HTTPStatus.OK
+        assert count_user_selects(context.captured_queries) == 0, (
+            'Проверьте, что при повторном запросе пользователь '
+            'аутентифицируется без запроса к базе данных.'
+        )
+
+    def test_02_cache_invalidated_on_save(self, user_client, user):
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        user.role = 'admin'
+        user.save()
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после изменения роли пользователя '
+            'кэшированные данные о нем сбрасываются.'
+        )
+        user.delete()
+        response = user_client.get(self.USERS_URL)
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удаленный пользователь не проходит '
+            'аутентификацию.'
+        )
@@ -0,0 +1,68 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ListCache:
+
+    CATEGORY_URL = '/api/v1/categories/'
+
+    def test_01_category_list_cached_and_invalidated(
+            self, client, admin_client, django_assert_num_queries):
+        categories = create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+        with django_assert_num_queries(0):
+            response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == len(categories), (
+            f'Проверьте, что ответ на GET-запрос к `{self.CATEGORY_URL}` '
+            'берется из кэша без запросов к базе данных.'
+        )
+
+        response = admin_client.delete(
+            f'{self.CATEGORY_URL}{categories[0]["slug"]}/'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == len(categories) - 1, (
+            f'Проверьте, что после удаления категории кэш ответа '
+            f'`{self.CATEGORY_URL}` сбрасывается.'
+        )
+
+    def test_02_evicted_version_does_not_repeat(self, client, admin_client):
+        from django.core.cache import cache
+
+        from api.v1.cache import get_version_key
+        from reviews.models import Category
+
+        client.get(self.CATEGORY_URL)
+        categories = create_categories(admin_client)
+        client.get(self.CATEGORY_URL)
+
+        cache.delete(get_version_key(Category))
+        response = client.get(self.CATEGORY_URL)
+        assert response.json()['count'] == len(categories), (
+            'Проверьте, что после вытеснения ключа версии из кэша версия '
+            'модели не повторяет прежние значения и устаревшие ответы не '
+            'возвращаются.'
+        )
+
+    def test_03_version_bumped_after_commit(self):
+        from django.db import transaction
+
+        from api.v1.cache import get_model_version
+        from reviews.models import Category
+
+        version = get_model_version(Category)
+        with transaction.atomic():
+            Category.objects.create(name='Фильмы', slug='films')
+            assert get_model_version(Category) == version, (
+                'Проверьте, что версия данных модели не меняется до '
+                'фиксации транзакции.'
+            )
+        assert get_model_version(Category) != version, (
+            'Проверьте, что версия данных модели меняется после фиксации '
+            'транзакции.'
+        )
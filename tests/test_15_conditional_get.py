@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15ConditionalGet:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def check_not_modified(self, client, url):
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок ETag.'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        return etag
+
+    def test_01_reviews_and_comments_etag(self, client, admin_client, admin,
+                                          user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        review_url = f'{reviews_url}{reviews[0]["id"]}/'
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+
+        list_etag = self.check_not_modified(client, reviews_url)
+        detail_etag = self.check_not_modified(client, review_url)
+        self.check_not_modified(client, comments_url)
+
+        response = admin_client.patch(review_url, data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.OK
+        for url, etag in ((reviews_url, list_etag),
+                          (review_url, detail_etag)):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что после изменения отзыва GET-запрос к `{url}` '
+                'с устаревшим `If-None-Match` возвращает новые данные.'
+            )
+
+    def test_02_list_has_no_last_modified(self, client, admin_client, admin,
+                                          user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        review_url = f'{reviews_url}{reviews[0]["id"]}/'
+        last_modified = client.get(review_url).get('Last-Modified')
+        assert last_modified, (
+            f'Проверьте, что ответ на GET-запрос к `{review_url}` содержит '
+            'заголовок Last-Modified.'
+        )
+        response = client.get(reviews_url)
+        assert not response.has_header('Last-Modified'), (
+            f'Проверьте, что ответ на GET-запрос к `{reviews_url}` не '
+            'содержит заголовок Last-Modified: он не меняется при '
+            'удалении отзыва.'
+        )
+        count = response.json()['count']
+
+        response = admin_client.delete(review_url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        response = client.get(
+            reviews_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что после удаления отзыва GET-запрос к '
+            f'`{reviews_url}` с `If-Modified-Since` возвращает новые данные.'
+        )
+        assert response.json()['count'] == count - 1
+
+    def test_03_comment_list_etag_changes(self, client, admin_client, admin,
+                                          user_client, user):
+        author_map = {admin: admin_client, user: user_client}
+        _, reviews, titles = create_comments(admin_client, author_map)
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        etags = [self.check_not_modified(client, comments_url)]
+        response = user_client.post(comments_url, data={'text': 'Новый'})
+        assert response.status_code == HTTPStatus.CREATED
+        etags.append(self.check_not_modified(client, comments_url))
+        response = user_client.delete(f'{comments_url}{response.json()["id"]}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        etags.append(self.check_not_modified(client, comments_url))
+        assert len(set(etags)) == 3, (
+            f'Проверьте, что ETag списка `{comments_url}` меняется при '
+            'добавлении и удалении комментария.'
+        )
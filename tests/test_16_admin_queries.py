@@ -0,0 +1,121 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, GenreTitle, Review, Title
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16AdminQueries:
+
+    CHANGELIST_URLS = (
+        '/admin/reviews/title/',
+        '/admin/reviews/genretitle/',
+        '/admin/reviews/review/',
+        '/admin/reviews/comment/',
+    )
+
+    def count_queries(self, client, url):
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        return len(context.captured_queries)
+
+    def test_01_changelist_query_count_is_constant(
+            self, client, user_superuser, admin_client, admin,
+            user_client, user, moderator_client, moderator):
+        client.force_login(user_superuser)
+        create_comments(admin_client, {admin: admin_client})
+        queries = {
+            url: self.count_queries(client, url)
+            for url in self.CHANGELIST_URLS
+        }
+        source = Title.objects.first()
+        for idx, author in enumerate((user, moderator), 1):
+            title = Title.objects.create(
+                name=f'Произведение {idx}', year=2000 + idx,
+                category=source.category
+            )
+            GenreTitle.objects.create(
+                title=title, genre=source.genre.first()
+            )
+            review = Review.objects.create(
+                title=title, author=author, text='Текст', score=idx
+            )
+            Comment.objects.create(review=review, author=author, text='Текст')
+        for url in self.CHANGELIST_URLS:
+            assert self.count_queries(client, url) == queries[url], (
+                f'Проверьте, что количество запросов к базе данных на '
+                f'странице `{url}` не зависит от количества записей.'
+            )
+
+    def test_02_author_filter_does_not_list_users(
+            self, client, user_superuser, admin_client, admin,
+            user_client, user):
+        client.force_login(user_superuser)
+        create_comments(admin_client, {admin: admin_client, user: user_client})
+        for url in ('/admin/reviews/review/', '/admin/reviews/comment/'):
+            content = client.get(url).content.decode()
+            assert f'?author__id__exact={user.id}' not in content, (
+                f'Проверьте, что боковая панель страницы `{url}` не '
+                'содержит отдельный вариант фильтра для каждого автора.'
+            )
+            response = client.get(url, {'author': user.username})
+            authors = {
+                obj.author for obj in response.context['cl'].result_list
+            }
+            assert authors == {user}, (
+                f'Проверьте, что страница `{url}` фильтрует записи по '
+                'имени пользователя автора из параметра `author`.'
+            )
+
+    def test_03_user_changelist_uses_username_filter(
+            self, client, user_superuser, user, moderator):
+        client.force_login(user_superuser)
+        response = client.get('/admin/users/user/', {'username': 'testu'})
+        assert response.status_code == HTTPStatus.OK
+        usernames = {
+            obj.username for obj in response.context['cl'].result_list
+        }
+        assert usernames == {user.username}, (
+            'Проверьте, что страница пользователей в админке фильтрует '
+            'пользователей по началу имени из параметра `username`.'
+        )
+
+    def test_04_approximate_count_for_large_tables(
+            self, client, user_superuser, admin_client, admin, monkeypatch):
+        from api_yamdb import admin_tools
+
+        client.force_login(user_superuser)
+        create_comments(admin_client, {admin: admin_client})
+        Review.objects.create(
+            title=Title.objects.last(), author=user_superuser,
+            text='Текст', score=1
+        )
+        Review.objects.filter(author=admin).delete()
+        monkeypatch.setattr(admin_tools, 'APPROXIMATE_COUNT_THRESHOLD', 1)
+        with CaptureQueriesContext(connection) as context:
+            response = client.get('/admin/reviews/review/')
+        assert response.context['cl'].result_count == Review.objects.aggregate(
+            size=Max('pk')
+        )['size'], (
+            'Проверьте, что количество записей большой таблицы без '
+            'фильтров оценивается без `COUNT(*)`.'
+        )
+        assert not any(
+            'COUNT(*)' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что страница отзывов в админке не выполняет '
+            '`COUNT(*)` по всей таблице.'
+        )
+        response = client.get(
+            '/admin/reviews/review/', {'author': user_superuser.username}
+        )
+        assert response.context['cl'].result_count == 1, (
+            'Проверьте, что для отфильтрованной страницы количество '
+            'записей считается точно.'
+        )
@@ -0,0 +1,65 @@
+import json
+import logging
+
+import pytest
+
+from tests.utils import create_titles
+
+SERVER_TIMING_METRICS = ('db', 'serializer', 'render', 'total')
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(', '):
+        name, value = metric.split(';', 1)
+        metrics[name] = value
+    return metrics
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ServerTiming:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_disabled_by_default(self, client):
+        response = client.get(self.TITLES_URL)
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что при `SERVER_TIMING_SAMPLE_RATE = 0` заголовок '
+            '`Server-Timing` не добавляется.'
+        )
+
+    def test_02_header_and_log_line(self, client, admin_client, settings,
+                                    caplog):
+        create_titles(admin_client)
+        settings.SERVER_TIMING_SAMPLE_RATE = 1
+        with caplog.at_level(logging.INFO, logger='api_yamdb.middleware'):
+            response = client.get(self.TITLES_URL)
+        assert 'Server-Timing' in response, (
+            'Проверьте, что при `SERVER_TIMING_SAMPLE_RATE = 1` ответ '
+            'содержит заголовок `Server-Timing`.'
+        )
+        metrics = parse_server_timing(response['Server-Timing'])
+        for metric in SERVER_TIMING_METRICS:
+            assert metrics.get(metric, '').startswith('dur='), (
+                f'Проверьте, что заголовок `Server-Timing` содержит '
+                f'метрику `{metric}` с длительностью.'
+            )
+        records = [
+            json.loads(record.getMessage()) for record in caplog.records
+            if record.name == 'api_yamdb.middleware'
+        ]
+        assert len(records) == 1, (
+            'Проверьте, что для каждого замеренного запроса в лог пишется '
+            'одна строка.'
+        )
+        record = records[0]
+        assert record['path'] == self.TITLES_URL
+        assert record['status'] == 200
+        assert record['queries'] > 0, (
+            'Проверьте, что строка лога содержит количество запросов к '
+            'базе данных.'
+        )
+        assert record['serializer_ms'] > 0, (
+            'Проверьте, что строка лога содержит время сериализации.'
+        )
+        assert metrics['queries'] == f'desc="{record["queries"]}"'
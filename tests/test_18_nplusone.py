@@ -0,0 +1,68 @@
+import pytest
+
+from api.v1.serializers import ReviewSerializer
+from api_yamdb.nplusone import NPlusOneDetector, NPlusOneError
+from reviews.models import Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18NPlusOne:
+
+    URLS = (
+        '/api/v1/titles/',
+        '/api/v1/titles/{title_id}/reviews/',
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/',
+    )
+
+    @pytest.fixture
+    def authors(self, admin, admin_client, user, user_client, moderator,
+                moderator_client):
+        return {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client
+        }
+
+    def test_01_detects_serializer_field(self, admin_client, authors):
+        create_comments(admin_client, authors)
+        detector = NPlusOneDetector()
+        with detector.capture():
+            ReviewSerializer(Review.objects.all(), many=True).data
+        problems = detector.problems
+        assert len(problems) == 1, (
+            'Проверьте, что детектор находит однотипные запросы авторов '
+            'отзывов при сериализации.'
+        )
+        problem = problems[0]
+        assert problem.count == len(authors)
+        assert problem.owner == 'ReviewSerializer.author', (
+            'Проверьте, что детектор указывает поле сериализатора, '
+            'из-за которого выполняются запросы.'
+        )
+
+    def test_02_api_lists_have_no_nplusone(self, client, admin_client,
+                                           authors, assert_no_nplusone):
+        comments, reviews, titles = create_comments(admin_client, authors)
+        for url in self.URLS:
+            url = url.format(
+                title_id=titles[0]['id'], review_id=reviews[0]['id']
+            )
+            with assert_no_nplusone():
+                client.get(url)
+
+    def test_03_middleware(self, client, admin_client, authors, settings,
+                           monkeypatch):
+        from api.v1 import views
+
+        comments, reviews, titles = create_comments(admin_client, authors)
+        settings.NPLUSONE_DETECTOR = True
+        settings.NPLUSONE_RAISE = True
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
+
+        monkeypatch.setattr(
+            views.ReviewViewSet, 'get_queryset',
+            lambda view: view.get_title().reviews.all()
+        )
+        with pytest.raises(NPlusOneError, match='ReviewSerializer.author'):
+            client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/')
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Profiler:
+
+    URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def profile_dir(self, settings, tmp_path):
+        settings.PROFILE_DIR = str(tmp_path)
+        return tmp_path
+
+    def test_01_admin_request_is_profiled(self, admin_client, profile_dir):
+        response = admin_client.get(self.URL, HTTP_X_PROFILE='1')
+        assert response.status_code == 200
+        file_name = response.get('X-Profile-File')
+        assert file_name, (
+            'Проверьте, что ответ на запрос администратора с заголовком '
+            '`X-Profile` содержит имя файла профиля в `X-Profile-File`.'
+        )
+        assert os.path.isfile(profile_dir / file_name), (
+            'Проверьте, что профиль запроса сохраняется в `PROFILE_DIR`.'
+        )
+        summary = (profile_dir / file_name).with_suffix('.txt').read_text()
+        assert summary.startswith(f'GET {self.URL}'), (
+            'Проверьте, что рядом с профилем сохраняется текстовая сводка.'
+        )
+
+    def test_02_other_requests_are_not_profiled(
+            self, client, user_client, admin_client, profile_dir):
+        responses = (
+            client.get(self.URL, HTTP_X_PROFILE='1'),
+            user_client.get(self.URL, HTTP_X_PROFILE='1'),
+            admin_client.get(self.URL),
+            client.get(
+                self.URL, HTTP_X_PROFILE='1',
+                HTTP_AUTHORIZATION='Bearer invalid'
+            ),
+        )
+        for response in responses:
+            assert 'X-Profile-File' not in response, (
+                'Проверьте, что профилируются только запросы '
+                'администраторов с заголовком `X-Profile`.'
+            )
+        assert not os.listdir(profile_dir)
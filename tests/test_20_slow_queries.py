@@ -0,0 +1,134 @@
+import json
+import logging
+
+import pytest
+from django.db import connection, transaction
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20SlowQueries:
+
+    @pytest.fixture(autouse=True)
+    def slow_queries(self, caplog, monkeypatch):
+        logger = logging.getLogger('api_yamdb.slow_queries')
+        monkeypatch.setattr(logger, 'handlers', [caplog.handler])
+        return caplog
+
+    def test_01_slow_query_entry(self, client, admin_client, settings,
+                                 slow_queries):
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        titles, _, _ = create_titles(admin_client)
+        slow_queries.clear()
+        client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        entries = [
+            json.loads(record.getMessage())
+            for record in slow_queries.records
+        ]
+        assert entries, (
+            'Проверьте, что запросы дольше `SLOW_QUERY_THRESHOLD_MS` '
+            'пишутся в журнал медленных запросов.'
+        )
+        entry = next(
+            entry for entry in entries if 'reviews_title' in entry['sql']
+        )
+        for key in ('duration_ms', 'sql', 'params', 'view', 'plan'):
+            assert key in entry, (
+                f'Проверьте, что запись журнала медленных запросов '
+                f'содержит ключ `{key}`.'
+            )
+        assert entry['view'] == 'TitleViewSet.retrieve', (
+            'Проверьте, что запись журнала указывает представление, '
+            'выполнившее запрос.'
+        )
+        assert str(titles[0]['id']) in map(str, entry['params'])
+        assert isinstance(entry['plan'], list) and entry['plan'], (
+            'Проверьте, что запись журнала содержит план выполнения запроса.'
+        )
+        assert not any(
+            entry['sql'].startswith('EXPLAIN') for entry in entries
+        ), 'Проверьте, что запросы EXPLAIN не попадают в журнал.'
+
+    def test_02_fast_queries_are_not_logged(self, client, settings,
+                                            slow_queries):
+        settings.SLOW_QUERY_THRESHOLD_MS = 10 ** 6
+        client.get('/api/v1/titles/')
+        assert not slow_queries.records, (
+            'Проверьте, что запросы быстрее `SLOW_QUERY_THRESHOLD_MS` '
+            'не пишутся в журнал.'
+        )
+
+    def test_03_with_statement_is_explained(self):
+        from api_yamdb.slow_queries import explain
+
+        plan = explain(
+            connection,
+            '  with recent as (select id from reviews_title) '
+            'select * from recent',
+            ()
+        )
+        assert isinstance(plan, list) and plan, (
+            'Проверьте, что для запросов `WITH` в журнал пишется план '
+            'выполнения.'
+        )
+        assert explain(connection, 'INSERT INTO reviews_genre VALUES', ()) \
+            is None
+
+    def test_04_failed_explain_keeps_transaction(self):
+        from api_yamdb.slow_queries import explain
+        from reviews.models import Genre
+
+        with transaction.atomic():
+            Genre.objects.create(name='Драма', slug='drama')
+            plan = explain(connection, 'SELECT * FROM missing_table', ())
+            assert isinstance(plan, str), (
+                'Проверьте, что ошибка EXPLAIN возвращается текстом.'
+            )
+            assert not connection.needs_rollback, (
+                'Проверьте, что ошибка EXPLAIN не прерывает транзакцию '
+                'исходного запроса.'
+            )
+            Genre.objects.create(name='Комедия', slug='comedy')
+        assert Genre.objects.count() == 2
+
+    def test_05_log_file_none_disables_log(self, settings):
+        from api_yamdb.slow_queries import (install_slow_query_log,
+                                            log_slow_query)
+
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        settings.SLOW_QUERY_LOG_FILE = None
+        new_connection = connection.copy()
+        try:
+            install_slow_query_log(sender=None, connection=new_connection)
+            assert log_slow_query not in new_connection.execute_wrappers, (
+                'Проверьте, что `SLOW_QUERY_LOG_FILE = None` отключает '
+                'журнал медленных запросов.'
+            )
+        finally:
+            new_connection.close()
+
+    def test_06_lazy_connection_keeps_wrappers(self, client, settings,
+                                               slow_queries, monkeypatch):
+        from api_yamdb.slow_queries import log_slow_query
+
+        settings.SLOW_QUERY_THRESHOLD_MS = 0
+        monkeypatch.setattr(connection, 'execute_wrappers', [])
+        opened = connection.connection
+        monkeypatch.setattr(
+            connection, 'get_new_connection', lambda params: opened
+        )
+        for _ in range(2):
+            # Соединение открывается заново внутри запроса, как после
+            # close_old_connections() при CONN_MAX_AGE = 0.
+            connection.connection = None
+            slow_queries.clear()
+            client.get('/api/v1/titles/')
+            assert connection.execute_wrappers == [log_slow_query], (
+                'Проверьте, что обертки промежуточных слоев не удаляют '
+                'журнал медленных запросов и не остаются у соединения.'
+            )
+            assert slow_queries.records, (
+                'Проверьте, что журнал медленных запросов работает после '
+                'завершения предыдущего запроса.'
+            )
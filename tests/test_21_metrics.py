@@ -0,0 +1,150 @@
+import json
+import os
+
+import pytest
+
+from api_yamdb.metrics import MetricsRegistry, registry
+
+METRICS_URL = '/metrics'
+
+
+def parse_metrics(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            name, value = line.rsplit(' ', 1)
+            samples[name] = float(value)
+    return samples
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21Metrics:
+
+    @pytest.fixture(autouse=True)
+    def reset_registry(self):
+        registry.reset()
+        yield
+        registry.reset()
+
+    def test_01_route_metrics(self, client):
+        for _ in range(2):
+            client.get('/api/v1/titles/')
+        client.get('/api/v1/genres/')
+        response = client.get(METRICS_URL)
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain'), (
+            f'Проверьте, что `{METRICS_URL}` отдает метрики в текстовом '
+            'формате Prometheus.'
+        )
+        samples = parse_metrics(response.content.decode())
+        labels = 'method="GET",route="api:titles-list"'
+        assert samples[
+            f'yamdb_http_requests_total{{{labels},status="200"}}'
+        ] == 2, (
+            'Проверьте, что метрики содержат количество запросов '
+            'по маршрутам.'
+        )
+        assert samples[
+            f'yamdb_http_request_duration_seconds_count{{{labels}}}'
+        ] == 2
+        assert samples[
+            f'yamdb_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+        ] == 2, (
+            'Проверьте, что метрики содержат гистограмму времени '
+            'обработки запросов.'
+        )
+        assert samples[
+            f'yamdb_http_response_size_bytes_sum{{{labels}}}'
+        ] > 0, 'Проверьте, что метрики содержат размер ответов.'
+        assert samples[f'yamdb_db_queries_total{{{labels}}}'] >= 2, (
+            'Проверьте, что метрики содержат количество запросов к базе '
+            'данных.'
+        )
+        assert (
+            'yamdb_http_requests_total{method="GET",'
+            'route="api:genres-list",status="200"}'
+        ) in samples
+
+    def test_02_processes_are_aggregated(self, client, settings, tmp_path):
+        settings.METRICS_DIR = str(tmp_path)
+        other = MetricsRegistry()
+        labels = (('method', 'GET'), ('route', 'api:titles-list'))
+        other.inc(
+            'yamdb_http_requests_total', labels + (('status', '200'),), 3
+        )
+        other.observe('yamdb_http_request_duration_seconds', labels, 0.2)
+        other.flush()
+        os.replace(other.file_name, tmp_path / 'metrics-1-1.json')
+        with open(tmp_path / 'metrics-2-1.json', 'w') as file:
+            json.dump([], file)
+
+        client.get('/api/v1/titles/')
+        samples = parse_metrics(client.get(METRICS_URL).content.decode())
+        assert samples[
+            'yamdb_http_requests_total{method="GET",'
+            'route="api:titles-list",status="200"}'
+        ] == 4, (
+            'Проверьте, что метрики складываются по файлам всех процессов '
+            'из `METRICS_DIR`.'
+        )
+        assert samples[
+            'yamdb_http_request_duration_seconds_bucket{method="GET",'
+            'route="api:titles-list",le="0.25"}'
+        ] >= 1
+
+    def test_03_access_is_restricted(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ()
+        settings.METRICS_TOKEN = None
+        assert client.get(METRICS_URL).status_code == 403, (
+            f'Проверьте, что `{METRICS_URL}` недоступен с адресов не из '
+            '`METRICS_ALLOWED_IPS`.'
+        )
+        settings.METRICS_TOKEN = 'secret'
+        assert client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer wrong'
+        ).status_code == 403
+        assert client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secret'
+        ).status_code == 200, (
+            f'Проверьте, что `{METRICS_URL}` доступен с токеном '
+            '`METRICS_TOKEN`.'
+        )
+
+    def test_04_unknown_methods_share_label(self, client):
+        client.generic('BREW', '/api/v1/titles/')
+        client.generic('PROPFIND', '/api/v1/titles/')
+        samples = parse_metrics(client.get(METRICS_URL).content.decode())
+        methods = {
+            name.split('method="', 1)[1].split('"', 1)[0]
+            for name in samples if 'method="' in name
+        }
+        assert methods == {'other'}, (
+            'Проверьте, что неизвестные методы HTTP записываются в метрики '
+            'с меткой `method="other"`.'
+        )
+        assert samples[
+            'yamdb_http_request_duration_seconds_count{method="other",'
+            'route="api:titles-list"}'
+        ] == 2
+
+    def test_05_reused_pid_keeps_old_file(self, settings, tmp_path,
+                                          monkeypatch):
+        settings.METRICS_DIR = str(tmp_path)
+        labels = (('method', 'GET'), ('route', 'api:titles-list'))
+        old = MetricsRegistry()
+        old.inc('yamdb_http_requests_total', labels, 3)
+        old.flush()
+        monkeypatch.setattr(
+            'api_yamdb.metrics.time.time_ns', lambda: old._started + 1
+        )
+        new = MetricsRegistry()
+        new.inc('yamdb_http_requests_total', labels, 1)
+        new.flush()
+        assert new.file_name != old.file_name, (
+            'Проверьте, что имя файла метрик содержит время запуска '
+            'процесса, а не только PID.'
+        )
+        assert new.collect()['yamdb_http_requests_total', labels] == 4, (
+            'Проверьте, что счетчики процесса с тем же PID не '
+            'перезаписывают счетчики завершившегося процесса.'
+        )
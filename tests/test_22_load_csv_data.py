@@ -0,0 +1,286 @@
+import csv
+import os
+import pickle
+import shutil
+from contextlib import nullcontext
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Avg, Count
+
+CSV_FILES = {
+    'category': 'reviews.Category',
+    'genre': 'reviews.Genre',
+    'titles': 'reviews.Title',
+    'genre_title': 'reviews.GenreTitle',
+    'users': 'users.User',
+    'review': 'reviews.Review',
+    'comments': 'reviews.Comment',
+}
+
+
+def read_csv(csv_dir, file_name):
+    with open(os.path.join(csv_dir, f'{file_name}.csv'),
+              encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+def write_csv(csv_dir, file_name, rows):
+    with open(os.path.join(csv_dir, f'{file_name}.csv'), 'w',
+              encoding='utf-8', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=rows[0].keys())
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+@pytest.fixture
+def csv_dir(settings, tmp_path):
+    csv_dir = tmp_path / 'data'
+    shutil.copytree(settings.CSV_FILES_DIR, csv_dir)
+    settings.CSV_FILES_DIR = str(csv_dir)
+    return csv_dir
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LoadCsvStream:
+
+    def test_01_stream_loads_all_tables(self, csv_dir):
+        from django.apps import apps
+        from reviews.models import Review, Title
+
+        call_command('load_csv_data', '--stream', '--batch-size', '10')
+
+        for file_name, label in CSV_FILES.items():
+            rows = read_csv(csv_dir, file_name)
+            assert apps.get_model(label).objects.count() == len(rows), (
+                'Проверьте, что `load_csv_data --stream` загружает все '
+                f'строки файла `{file_name}.csv`.'
+            )
+        review_rows = {
+            int(row['id']): row for row in read_csv(csv_dir, 'review')
+        }
+        for review in Review.objects.all():
+            row = review_rows[review.id]
+            assert (review.title_id, review.author_id) == (
+                int(row['title_id']), int(row['author'])
+            ), (
+                'Проверьте, что `load_csv_data --stream` записывает внешние '
+                'ключи из csv-файла в поля `*_id`.'
+            )
+        titles = Title.objects.annotate(
+            average=Avg('reviews__score'), total=Count('reviews')
+        )
+        for title in titles:
+            assert title.rating_count == title.total
+            assert title.rating == title.average, (
+                'Проверьте, что после `load_csv_data --stream` рейтинги '
+                'произведений пересчитываются.'
+            )
+
+    @pytest.mark.parametrize('file_name,column,value', [
+        ('review', 'score', 'десять'),
+        ('users', 'date_joined', 'вчера'),
+    ])
+    def test_02_stream_reports_malformed_values(self, csv_dir, file_name,
+                                                column, value):
+        from django.apps import apps
+        from reviews.models import Category
+
+        rows = read_csv(csv_dir, file_name)
+        for row in rows:
+            row.setdefault(column, '2020-01-01T00:00:00Z')
+        rows[0][column] = value
+        write_csv(csv_dir, file_name, rows)
+
+        call_command('load_csv_data', '--stream')
+
+        model = apps.get_model(CSV_FILES[file_name])
+        assert not model.objects.exists(), (
+            'Проверьте, что `load_csv_data --stream` сообщает об ошибке '
+            'в значениях csv-файла и не загружает таблицу частично.'
+        )
+        assert Category.objects.exists()
+
+
+@pytest.mark.parametrize('option', ('--batch-size', '--workers'))
+@pytest.mark.parametrize('value', ('0', '-5', 'много'))
+def test_non_positive_sizes_are_rejected(option, value):
+    from django.core.management import CommandError
+
+    with pytest.raises(CommandError, match=option.lstrip('-')):
+        call_command('load_csv_data', '--stream', option, value)
+
+
+def test_tables_dependencies():
+    from reviews.management.commands.load_csv_data import (
+        get_tables_dependencies
+    )
+
+    assert get_tables_dependencies() == {
+        'category': set(),
+        'genre': set(),
+        'users': set(),
+        'titles': {'category'},
+        'genre_title': {'genre', 'titles'},
+        'review': {'titles', 'users'},
+        'comments': {'review', 'users'},
+    }, (
+        'Проверьте, что граф зависимостей таблиц строится по внешним '
+        'ключам моделей.'
+    )
+
+
+def test_parse_csv_file_writes_bounded_batches(csv_dir, tmp_path):
+    from reviews.management.commands.load_csv_data import (
+        parse_csv_file, read_parsed_rows
+    )
+
+    path = parse_csv_file('review', 'reviews.Review', 10, str(tmp_path))
+    batches = []
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                batches.append(pickle.load(file))
+            except EOFError:
+                break
+    rows = read_csv(csv_dir, 'review')
+    assert max(map(len, batches)) <= 10, (
+        'Проверьте, что процесс пула сохраняет строки пакетами '
+        'не больше `--batch-size`.'
+    )
+    parsed = list(read_parsed_rows(path))
+    assert len(parsed) == len(rows)
+    assert parsed[0]['title_id'] == int(rows[0]['title_id'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LoadCsvParallel:
+
+    def test_01_workers_load_all_tables(self, csv_dir, tmp_path,
+                                        monkeypatch):
+        from django.apps import apps
+        from reviews.management.commands import load_csv_data
+        from reviews.models import Review
+
+        parsed_dir = tmp_path / 'parsed'
+        parsed_dir.mkdir()
+        monkeypatch.setattr(
+            load_csv_data, 'TemporaryDirectory',
+            lambda: nullcontext(str(parsed_dir))
+        )
+        call_command(
+            'load_csv_data', '--stream', '--workers', '3',
+            '--batch-size', '10'
+        )
+
+        for file_name, label in CSV_FILES.items():
+            rows = read_csv(csv_dir, file_name)
+            assert apps.get_model(label).objects.count() == len(rows), (
+                'Проверьте, что `load_csv_data --stream --workers N` '
+                f'загружает все строки файла `{file_name}.csv`.'
+            )
+        assert Review.objects.filter(title__rating_count__gt=0).exists()
+        assert not os.listdir(parsed_dir), (
+            'Проверьте, что временные файлы подготовленных таблиц '
+            'удаляются после записи таблицы.'
+        )
+
+    def test_02_dependent_tables_are_skipped(self, csv_dir):
+        from reviews.models import (
+            Category, Comment, Genre, GenreTitle, Review, Title
+        )
+        from users.models import User
+
+        rows = read_csv(csv_dir, 'titles')
+        rows[0]['year'] = 'давно'
+        write_csv(csv_dir, 'titles', rows)
+
+        call_command('load_csv_data', '--stream', '--workers', '2')
+
+        for model in (Title, GenreTitle, Review, Comment):
+            assert not model.objects.exists(), (
+                'Проверьте, что таблицы, зависящие от незагруженной, '
+                'пропускаются.'
+            )
+        for model in (Category, Genre, User):
+            assert model.objects.exists(), (
+                'Проверьте, что независимые таблицы загружаются, '
+                'даже если другая таблица не загружена.'
+            )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LoadCsvUpsert:
+
+    def test_01_upsert_loads_all_tables(self, csv_dir):
+        from django.apps import apps
+        from reviews.models import ImportState
+
+        call_command('load_csv_data', '--upsert', '--batch-size', '10')
+
+        for file_name, label in CSV_FILES.items():
+            rows = read_csv(csv_dir, file_name)
+            assert apps.get_model(label).objects.count() == len(rows), (
+                'Проверьте, что `load_csv_data --upsert` загружает все '
+                f'строки файла `{file_name}.csv`.'
+            )
+        assert ImportState.objects.filter(table='review').count() == (
+            (len(read_csv(csv_dir, 'review')) + 9) // 10
+        ), (
+            'Проверьте, что `load_csv_data --upsert` сохраняет контрольные '
+            'суммы записанных частей файла.'
+        )
+
+    def test_02_rerun_without_changes_writes_nothing(self, csv_dir):
+        from reviews.management.commands.load_csv_data import upsert_csv
+        from reviews.models import ImportState, Review
+
+        call_command('load_csv_data', '--upsert', '--batch-size', '10')
+        pub_dates = dict(Review.objects.values_list('id', 'pub_date'))
+
+        assert upsert_csv('review', Review, 10) == 0, (
+            'Проверьте, что повторная загрузка неизмененного файла '
+            'ничего не записывает.'
+        )
+        ImportState.objects.filter(table='review').delete()
+        assert upsert_csv('review', Review, 10) == 0, (
+            'Проверьте, что строки без изменений не перезаписываются, '
+            'даже если контрольные суммы частей файла потеряны.'
+        )
+        assert dict(
+            Review.objects.values_list('id', 'pub_date')
+        ) == pub_dates
+
+        rows = read_csv(csv_dir, 'review')
+        rows[-1]['text'] = 'Новый текст'
+        write_csv(csv_dir, 'review', rows)
+        assert upsert_csv('review', Review, 10) == 1, (
+            'Проверьте, что записываются только измененные строки.'
+        )
+        assert Review.objects.get(pk=rows[-1]['id']).text == 'Новый текст'
+
+    def test_03_interrupted_run_is_resumed(self, csv_dir):
+        from reviews.management.commands.load_csv_data import upsert_csv
+        from reviews.models import ImportState, Review
+
+        rows = read_csv(csv_dir, 'review')
+        original_score = rows[25]['score']
+        rows[25]['score'] = 'десять'
+        write_csv(csv_dir, 'review', rows)
+        call_command('load_csv_data', '--upsert', '--batch-size', '10')
+
+        assert Review.objects.count() == 20, (
+            'Проверьте, что при ошибке загрузка останавливается, сохранив '
+            'уже записанные части файла.'
+        )
+        assert set(ImportState.objects.filter(
+            table='review'
+        ).values_list('chunk', flat=True)) == {0, 1}
+
+        rows[25]['score'] = original_score
+        write_csv(csv_dir, 'review', rows)
+        assert upsert_csv('review', Review, 10) == len(rows) - 20, (
+            'Проверьте, что повторный запуск продолжает прерванную '
+            'загрузку с первой незаписанной части.'
+        )
+        assert Review.objects.count() == len(rows)